@@ -1,7 +1,7 @@
 import math
+from typing import Callable
 
 import tcod
-from tcod.context import Context
 
 from character_sheet.enums import AbilityScore
 from color import Color
@@ -36,10 +36,13 @@ class AbilityScoreMenu(Menu):
             'UP': tcod.event.K_UP,
             'DOWN': tcod.event.K_DOWN,
             'LEFT': tcod.event.K_LEFT,
-            'RIGHT': tcod.event.K_RIGHT
+            'RIGHT': tcod.event.K_RIGHT,
+            'CONFIRM': tcod.event.K_RETURN,
+            'CANCEL': tcod.event.K_ESCAPE
         }
         self._ability_table = {}
         self._free_points = 0
+        self._compile_bindings()
 
     @property
     def free_points(self) -> int:
@@ -93,11 +96,20 @@ class AbilityScoreMenu(Menu):
                 total += 5 + (score - 13) * 2
         return total
 
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        max_length = find_max_length(self._ability_table.keys())
+        width = max(len(f'points remaining: {self._free_points - self.ability_score_cost()}'), max_length + 6)
+        return (*self._position, max(self._width, width), max(self._height, len(self._ability_table) + 1))
+
+    def render_state(self, *args) -> tuple:
+        return super().render_state(*args) + (self._free_points, tuple(self._ability_table.items()))
+
     def render(self):
         if self._activated:
             color: Color
             x, y = self._position
-            color = Color(1.0, 0.0, 0.0)
+            color = Color.intern(1.0, 0.0, 0.0)
             self._console.print(
                 x=x,
                 y=y,
@@ -107,9 +119,9 @@ class AbilityScoreMenu(Menu):
             max_length = find_max_length(self._ability_table.keys())
             for item, data_item in enumerate(self._ability_table.keys()):
                 if item == self._curser[1] and not self.paused:
-                    color = Color(0.0, 1.0, 0.0)
+                    color = Color.intern(0.0, 1.0, 0.0)
                 else:
-                    color = Color(1.0, 1.0, 1.0)
+                    color = Color.intern(1.0, 1.0, 1.0)
                 data_name: AbilityScore = data_item
                 self._console.print(
                     x=x,
@@ -118,32 +130,12 @@ class AbilityScoreMenu(Menu):
                     fg=color.rgb()
                 )
 
-    def process(self, fps: int, context: Context):
-        if self._activated and not self._paused:
-            for event in tcod.event.wait(1.0 / fps):
-                context.convert_event(event)
-                match event:
-                    case tcod.event.Quit():
-                        print(f"KeyDown: {event}")
-                        menu_command = self.menu_options['quit'.upper()]
-                        print(f'MenuCommand{menu_command.name, menu_command.command}')
-                        menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
-                    case tcod.event.KeyDown():
-                        print(f"KeyDown: {event}")
-                        if event.sym == self._key_codes['UP']:
-                            self.curser_up()
-                        elif event.sym == self._key_codes['DOWN']:
-                            self.curser_down()
-                        if event.sym == self._key_codes['LEFT']:
-                            self.curser_left()
-                        elif event.sym == self._key_codes['RIGHT']:
-                            self.curser_right()
-                        elif event.sym == tcod.event.K_RETURN:
-                            menu_command = self.menu_options['confirm'.upper()]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(self._ability_table, *menu_command.positional_args,
-                                                 **menu_command.keyword_args)
-                        elif event.sym == tcod.event.K_ESCAPE:
-                            menu_command = self.menu_options['cancel'.upper()]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
+    def _actions(self) -> dict[str, Callable]:
+        return {
+            'UP': self.curser_up,
+            'DOWN': self.curser_down,
+            'LEFT': self.curser_left,
+            'RIGHT': self.curser_right,
+            'CONFIRM': self._command('confirm', lambda: self._ability_table),
+            'CANCEL': self._command('cancel')
+        }
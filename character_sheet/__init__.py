@@ -2,18 +2,21 @@ from character_sheet.enums import ResistanceLevel, EquipmentSlot
 from character_sheet.equipment import Armor, Equipment, Weapon
 from character_sheet.stat_block import StatBlock
 from typing import Dict
-from die import Dice
+from die import Advantage, Dice, DiceStream, registry
 import math
 
 
 class CharacterSheet:
-    def __init__(self, ability_scores: StatBlock, race, role):
+    def __init__(self, ability_scores: StatBlock, race, role, stream: DiceStream = None):
         self.ability_scores = ability_scores
         self.race = race
         self.role = role
         if 'ability_mod' in race:
             self.ability_scores.apply_race_ability_scores(self.race['ability_mod'])
-        self.dice = {'1d20': Dice('1d20')}
+        if stream is None:
+            stream = registry.stream()
+        self._stream = stream
+        self.dice = {'1d20': registry.dice('1d20', self._stream)}
         if 'natural_weapon' in self.race:
             die_type, damage_type = race['natural_weapon']
             self.add_dice(die_type)
@@ -28,6 +31,10 @@ class CharacterSheet:
         self._max_hp = 10 + self.ability_scores.con_mod
         self._hp = self._max_hp
 
+    @property
+    def stream(self) -> DiceStream:
+        return self._stream
+
     @property
     def movement_speed(self) -> int:
         if 'movement_speed' in self.race:
@@ -71,7 +78,7 @@ class CharacterSheet:
 
     def add_dice(self, die_type: str):
         if die_type not in self.dice:
-            self.dice[die_type] = Dice(die_type)
+            self.dice[die_type] = registry.dice(die_type, self._stream)
 
     def equip(self, item: Equipment, offhand_weapon: bool = False):
         if type(item) is Weapon:
@@ -119,24 +126,40 @@ class CharacterSheet:
     def roll_initiative(self):
         return self.dice['1d20'].roll(modifier=self.ability_scores.dex_mod)
 
-    def attack(self, target_ac: int, weapon_slot: EquipmentSlot = None) -> tuple[bool, int]:
-        modifier = self.ability_scores.str_mod
+    def get_weapon(self, weapon_slot: EquipmentSlot = None) -> Weapon or None:
         if (weapon_slot is EquipmentSlot.hand_r or weapon_slot is EquipmentSlot.hand_l) and \
                 type(self.equipment[weapon_slot]) is Weapon:
-            weapon: Weapon = self.equipment[weapon_slot]
+            return self.equipment[weapon_slot]
+        return None
+
+    def attack_modifier(self, weapon_slot: EquipmentSlot = None) -> int:
+        modifier = self.ability_scores.str_mod
+        weapon = self.get_weapon(weapon_slot)
+        if weapon is not None:
             modifier += weapon.modifier
-        roll = self.dice['1d20'].roll(modifier=modifier)
+        return modifier
+
+    def damage_dice(self, weapon_slot: EquipmentSlot = None) -> tuple[Dice, str]:
+        weapon = self.get_weapon(weapon_slot)
+        if weapon is not None:
+            return self.dice[weapon.die_type], weapon.damage_type
+        return self.dice[self.race['natural_weapon'][0]], self.race['natural_weapon'][1]
+
+    def attack(self, target_ac: int, weapon_slot: EquipmentSlot = None) -> tuple[bool, int]:
+        roll = self.dice['1d20'].roll(modifier=self.attack_modifier(weapon_slot))
         return roll > target_ac, roll
 
+    def hit_chance(self, target_ac: int, weapon_slot: EquipmentSlot = None, advantage: Advantage = None) -> float:
+        attack_roll = self.dice['1d20'].distribution(advantage=advantage, modifier=self.attack_modifier(weapon_slot))
+        return attack_roll.probability_at_least(target_ac + 1)
+
     def roll_damage(self, weapon_slot: EquipmentSlot = None) -> tuple[int, str]:
-        modifier = self.ability_scores.str_mod
-        if (weapon_slot is EquipmentSlot.hand_r or weapon_slot is EquipmentSlot.hand_l) and \
-                type(self.equipment[weapon_slot]) is Weapon:
-            weapon: Weapon = self.equipment[weapon_slot]
-            modifier += weapon.modifier
-            return self.dice[weapon.die_type].roll(modifier=modifier), weapon.damage_type
-        else:
-            return self.dice[self.race['natural_weapon'][0]].roll(modifier=modifier), self.race['natural_weapon'][1]
+        die, damage_type = self.damage_dice(weapon_slot)
+        return die.roll(modifier=self.attack_modifier(weapon_slot)), damage_type
+
+    def expected_damage(self, weapon_slot: EquipmentSlot = None) -> tuple[float, str]:
+        die, damage_type = self.damage_dice(weapon_slot)
+        return die.distribution(modifier=self.attack_modifier(weapon_slot)).mean, damage_type
 
     def take_damage(self, damage: int, damage_type: str):
         if 'resistances' in self.race and damage_type in self.race['resistances']:
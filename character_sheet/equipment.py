@@ -1,4 +1,5 @@
 from character_sheet.enums import EquipmentSlot
+from die.expression import DiceExpression, compile_expression
 from abc import ABC, abstractmethod
 
 
@@ -57,13 +58,11 @@ class Weapon(Equipment):
         roll_type, damage_type = roll_type
         self._name = name
         self._equipment_slot = equipment_slot
-        if '+' in roll_type:
-            self._die_type, self._modifier = roll_type.split(sep='+')
-        elif '-' in roll_type:
-            self._die_type, self._modifier = roll_type.split(sep='-')
-        elif roll_type is not None:
-            self._die_type, self._modifier = roll_type, 0
+        if roll_type is not None:
+            self._expression = compile_expression(roll_type)
+            self._die_type, self._modifier = self._expression.die_type, self._expression.constant
         else:
+            self._expression = None
             self._die_type, self._modifier = None, None
         self._damage_type = damage_type
         self._zweihand = zweihand
@@ -77,6 +76,14 @@ class Weapon(Equipment):
     def equipment_slot(self) -> EquipmentSlot:
         return self._equipment_slot
 
+    @property
+    def expression(self) -> DiceExpression:
+        return self._expression
+
+    @property
+    def roll_type(self) -> str:
+        return self._expression.text
+
     @property
     def die_type(self) -> str:
         return self._die_type
@@ -96,3 +103,7 @@ class Weapon(Equipment):
     @property
     def restrictions(self) -> list[str]:
         return self._restrictions
+
+    @property
+    def name(self):
+        return self._name
@@ -1,31 +1,57 @@
+from __future__ import annotations
+
+import numpy
+
+
 class Color:
+    _interned: dict[tuple[float, float, float], Color] = {}
+
     def __init__(self, r: float, g: float, b: float, /):
         self._r = r
         self._g = g
         self._b = b
+        self._palette = numpy.array(
+            [[variant(r, g, b, invert, shift) for shift in range(3)] for invert in (False, True)],
+            dtype=numpy.uint8
+        )
+        self._palette.flags.writeable = False
+        self._variants = [[tuple(int(value) for value in rgb) for rgb in row] for row in self._palette]
+
+    @classmethod
+    def intern(cls, r: float, g: float, b: float, /) -> Color:
+        key = (r, g, b)
+        if key not in cls._interned:
+            cls._interned[key] = cls(r, g, b)
+        return cls._interned[key]
+
+    @property
+    def components(self) -> tuple[float, float, float]:
+        return self._r, self._g, self._b
+
+    @property
+    def palette(self) -> numpy.ndarray:
+        return self._palette
 
     def rgb(self, *, invert: bool = None, shift: int = None) -> (int, int, int):
-        if invert is None:
-            invert = False
-        if shift is None:
-            shift = 0
-
-        r = self._r
-        g = self._g
-        b = self._b
-
-        if invert:
-            r = -r
-            g = -g
-            b = -b
-
-        match shift % 3:
-            case 0:
-                return constrain(r), constrain(g), constrain(b)
-            case 1:
-                return constrain(g), constrain(b), constrain(r)
-            case 2:
-                return constrain(b), constrain(r), constrain(g)
+        return self._variants[1 if invert else 0][0 if shift is None else shift % 3]
+
+    def rgb_array(self, *, invert: bool = None, shift: int = None) -> numpy.ndarray:
+        return self._palette[1 if invert else 0, 0 if shift is None else shift % 3]
+
+
+def variant(r: float, g: float, b: float, invert: bool, shift: int) -> (int, int, int):
+    if invert:
+        r = -r
+        g = -g
+        b = -b
+
+    match shift % 3:
+        case 0:
+            return constrain(r), constrain(g), constrain(b)
+        case 1:
+            return constrain(g), constrain(b), constrain(r)
+        case 2:
+            return constrain(b), constrain(r), constrain(g)
 
 
 def constrain(color_val: float, /) -> int:
@@ -1,86 +1,74 @@
 from __future__ import annotations
+from die.distribution import Distribution
 from die.enums import Advantage
+from die.expression import DiceExpression, DiceTerm, compile_expression
+from die.record import RollRecord
+from die.stream import DiceStream
 from traceback import print_tb
 from sys import exc_info
 from typing import List
 import random
 
+import numpy
 
-def roll(rand_gen: random.Random, number: int, size: int) -> int:
-    result = 0
-    for die in range(number):
-        result += rand_gen.randint(1, size)
-    return result
 
+def make_verbose(result: int, rolls: List[int]) -> RollRecord:
+    return RollRecord(result, tuple(rolls))
 
-def roll_advantage(rand_gen: random.Random, number: int, size: int, advantage: Advantage = None) -> int:
+
+def make_advantage_verbose(advantage: Advantage, result: int, verbose_a: RollRecord, verbose_b: RollRecord) \
+        -> RollRecord:
+    return RollRecord(result, advantage=advantage, branches=(verbose_a, verbose_b))
+
+
+def roll_expression(rand_gen: random.Random, expression: DiceExpression, advantage: Advantage = None) -> int:
     if advantage is None:
         advantage = Advantage.no
     match advantage:
         case Advantage.no:
-            return roll(rand_gen, number, size)
+            return expression.roll(rand_gen)
         case Advantage.adv:
-            result_a: int = roll(rand_gen, number, size)
-            result_b: int = roll(rand_gen, number, size)
-            return max(result_a,  result_b)
+            return max(expression.roll(rand_gen), expression.roll(rand_gen))
         case Advantage.dis:
-            result_a: int = roll(rand_gen, number, size)
-            result_b: int = roll(rand_gen, number, size)
-            return min(result_a,  result_b)
-
-
-def make_verbose(result: int, rolls: List[int]) -> str:
-    analysis: str = f'Total:{result}, Rolls:('
-    for r in rolls:
-        analysis = f'{analysis}{r}, '
-    analysis = analysis[0:-2]
-    analysis = f'{analysis})'
-    return analysis
+            return min(expression.roll(rand_gen), expression.roll(rand_gen))
 
 
-def roll_verbose(rand_gen: random.Random, number: int, size: int) -> (int, str):
-    rolls: List[int] = []
-    for die in range(number):
-        this_roll = rand_gen.randint(1, size)
-        rolls.append(this_roll)
-    result = sum(rolls)
-    return result, make_verbose(result, rolls)
-
-
-def roll_advantage_verbose(rand_gen: random.Random, number: int, size: int, advantage: Advantage = None)\
-        -> (int, str):
+def roll_expression_verbose(rand_gen: random.Random, expression: DiceExpression, advantage: Advantage = None)\
+        -> (int, RollRecord):
     if advantage is None:
         advantage = Advantage.no
-    match advantage:
-        case Advantage.no:
-            return roll_verbose(rand_gen, number, size)
-        case Advantage.adv:
-            result_a, verbose_a = roll_verbose(rand_gen, number, size)
-            result_b, verbose_b = roll_verbose(rand_gen, number, size)
-            analysis = f'First roll:{verbose_a}\nSecond roll:{verbose_b}\n'
-            result = max(result_a,  result_b)
-            return result, f'{analysis}Advantage: {result}'
-        case Advantage.dis:
-            result_a, verbose_a = roll_verbose(rand_gen, number, size)
-            result_b, verbose_b = roll_verbose(rand_gen, number, size)
-            analysis = f'First roll:{verbose_a}\nSecond roll:{verbose_b}\n'
-            result = min(result_a,  result_b)
-            return result, f'{analysis}Disadvantage: {result}'
+    result_a, rolls_a = expression.roll_faces(rand_gen)
+    if advantage is Advantage.no:
+        return result_a, make_verbose(result_a, rolls_a)
+    result_b, rolls_b = expression.roll_faces(rand_gen)
+    if advantage is Advantage.adv:
+        result = max(result_a, result_b)
+    else:
+        result = min(result_a, result_b)
+    verbose_a, verbose_b = make_verbose(result_a, rolls_a), make_verbose(result_b, rolls_b)
+    return result, make_advantage_verbose(advantage, result, verbose_a, verbose_b)
 
 
 class Dice:
-    def __init__(self, die_type: str, seed: int = None):
+    def __init__(self, die_type: str, seed: int = None, stream: DiceStream = None):
         try:
             self._number, self._size = Dice.__parse_die_type__(die_type)
+            self._expression = compile_expression(die_type)
         except ValueError as error:
             exc_type, exc_value, exc_traceback = exc_info()
             print_tb(exc_traceback)
             print(error)
             self._number, self._size = None, None
-        if seed is None:
-            seed = random.randint(1, 100000)
-        self._seed = seed
-        self.rand_gen = random.Random(self._seed)
+            self._expression = None
+        if stream is None:
+            if seed is None:
+                seed = random.randint(1, 100000)
+            self._seed = seed
+            self.rand_gen: random.Random or DiceStream = random.Random(self._seed)
+        else:
+            self._seed = stream.seed
+            self.rand_gen = stream
+        self._batch_gen: numpy.random.Generator = None
         self._die_type = die_type
 
     @classmethod
@@ -89,14 +77,10 @@ class Dice:
 
     @classmethod
     def __parse_die_type__(cls, new_dice_type: str) -> (int, int):
-        number_size = new_dice_type.split(sep='d')
-        number = int(number_size[0])
-        if number < 1:
-            raise ValueError(f'\nNumber of dice is below the minimum of 1: {number}')
-        size = int(number_size[1])
-        if size < 2:
-            raise ValueError(f'\nSize of dice is below the minimum of 2: {size}')
-        return number, size
+        expression = compile_expression(new_dice_type)
+        if len(expression.terms) == 0:
+            raise ValueError(f'\nNo dice found in die type: {new_dice_type}')
+        return expression.number, expression.size
 
     def __str__(self):
         return f'Dice(die_type:{self.die_type}, seed:{self._seed})'
@@ -117,35 +101,96 @@ class Dice:
     def size(self) -> int:
         return self._size
 
+    @property
+    def expression(self) -> DiceExpression:
+        return self._expression
+
+    @property
+    def stream(self) -> DiceStream or None:
+        if isinstance(self.rand_gen, DiceStream):
+            return self.rand_gen
+        return None
+
+    @property
+    def batch_gen(self) -> numpy.random.Generator:
+        if self._batch_gen is None:
+            if self.stream is not None:
+                self._batch_gen = self.stream.named_substream(f'batch:{self._die_type}').spawn_generator()
+            else:
+                self._batch_gen = numpy.random.default_rng(self._seed)
+        return self._batch_gen
+
     def is_valid(self) -> bool:
-        if self.size is None or self.number is None or self.die_type is None or self.rand_gen is None:
+        if self.size is None or self.number is None or self.die_type is None or self.rand_gen is None or \
+                self.expression is None:
             return False
         else:
             return True
 
-    def roll(self, *, verbose: bool = None, modifier: int = None) -> (int, str):
+    def roll(self, *, verbose: bool = None, modifier: int = None) -> (int, RollRecord or str):
         if verbose:
-            result, verbose_result = roll_verbose(self.rand_gen, self.number, self.size)
+            result, verbose_result = roll_expression_verbose(self.rand_gen, self._expression)
             if modifier:
                 result += modifier
-                verbose_result = f'{verbose_result}. Modifier: {modifier}'
+                verbose_result = verbose_result.with_modifier(modifier)
             return result, verbose_result
         else:
             if modifier:
-                return modifier + roll(self.rand_gen, self.number, self.size)
-            return roll(self.rand_gen, self.number, self.size), ''
+                return modifier + roll_expression(self.rand_gen, self._expression)
+            return roll_expression(self.rand_gen, self._expression), ''
 
-    def roll_advantage(self, *, advantage: Advantage = None, verbose: bool = None, modifier: int = None) -> (int, str):
+    def roll_advantage(self, *, advantage: Advantage = None, verbose: bool = None, modifier: int = None) \
+            -> (int, RollRecord or str):
         if advantage is None:
             advantage = Advantage.no
         if verbose:
-            result, verbose_result = roll_advantage_verbose(self.rand_gen, self.number, self.size, advantage)
+            result, verbose_result = roll_expression_verbose(self.rand_gen, self._expression, advantage)
             if modifier:
                 result += modifier
-                verbose_result = f'{verbose_result}. Modifier: {modifier}'
+                verbose_result = verbose_result.with_modifier(modifier)
             return result, verbose_result
         else:
             if modifier:
-                return modifier + roll_advantage(self.rand_gen, self.number, self.size, advantage)
+                return modifier + roll_expression(self.rand_gen, self._expression, advantage)
             else:
-                return roll_advantage(self.rand_gen, self.number, self.size, advantage), ''
+                return roll_expression(self.rand_gen, self._expression, advantage), ''
+
+    def roll_batch(self, trials: int, *, advantage: Advantage = None, modifier: int = None) -> numpy.ndarray:
+        results = self._expression.roll_batch(self.batch_gen, trials, advantage)
+        if modifier:
+            results += modifier
+        return results
+
+    def distribution(self, *, advantage: Advantage = None, modifier: int = None) -> Distribution:
+        return self._expression.distribution(advantage, modifier)
+
+
+class DiceRegistry:
+    def __init__(self, seed: int = None):
+        if seed is None:
+            seed = random.randint(1, 100000)
+        self._root = DiceStream(seed)
+        self._owners = 0
+
+    @property
+    def seed(self) -> int:
+        return self._root.seed
+
+    def stream(self, seed: int = None) -> DiceStream:
+        if seed is not None:
+            return DiceStream(seed)
+        new_stream = self._root.substream(self._owners)
+        self._owners += 1
+        return new_stream
+
+    def expression(self, die_type: str) -> DiceExpression:
+        return compile_expression(die_type)
+
+    def dice(self, die_type: str, stream: DiceStream) -> Dice:
+        interned = stream.interned_dice
+        if die_type not in interned:
+            interned[die_type] = Dice(die_type, stream=stream)
+        return interned[die_type]
+
+
+registry = DiceRegistry()
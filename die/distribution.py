@@ -0,0 +1,95 @@
+from __future__ import annotations
+from functools import lru_cache
+
+import numpy
+
+from die.enums import Advantage
+
+
+@lru_cache(maxsize=None)
+def dice_pmf(number: int, size: int) -> numpy.ndarray:
+    if number == 1:
+        pmf = numpy.full(size, 1.0 / size)
+    else:
+        half = number // 2
+        pmf = numpy.convolve(dice_pmf(half, size), dice_pmf(number - half, size))
+    pmf.flags.writeable = False
+    return pmf
+
+
+class Distribution:
+    def __init__(self, minimum: int, pmf: numpy.ndarray):
+        self._minimum = minimum
+        self._pmf = pmf
+        self._cdf: numpy.ndarray = None
+
+    @property
+    def minimum(self) -> int:
+        return self._minimum
+
+    @property
+    def maximum(self) -> int:
+        return self._minimum + len(self._pmf) - 1
+
+    @property
+    def totals(self) -> numpy.ndarray:
+        return numpy.arange(self.minimum, self.maximum + 1)
+
+    @property
+    def pmf(self) -> numpy.ndarray:
+        return self._pmf
+
+    @property
+    def cdf(self) -> numpy.ndarray:
+        if self._cdf is None:
+            self._cdf = numpy.minimum(numpy.cumsum(self._pmf), 1.0)
+            self._cdf.flags.writeable = False
+        return self._cdf
+
+    @property
+    def mean(self) -> float:
+        return float(numpy.dot(self.totals, self._pmf))
+
+    @property
+    def variance(self) -> float:
+        deviation = self.totals - self.mean
+        return float(numpy.dot(deviation * deviation, self._pmf))
+
+    def probability(self, total: int) -> float:
+        if self.minimum <= total <= self.maximum:
+            return float(self._pmf[total - self.minimum])
+        return 0.0
+
+    def probability_at_least(self, target: int) -> float:
+        if target <= self.minimum:
+            return 1.0
+        if target > self.maximum:
+            return 0.0
+        return float(max(1.0 - self.cdf[target - self.minimum - 1], 0.0))
+
+    def shift(self, modifier: int) -> Distribution:
+        return Distribution(self._minimum + modifier, self._pmf)
+
+    def negate(self) -> Distribution:
+        return Distribution(-self.maximum, self._pmf[::-1])
+
+    def combine(self, other: Distribution) -> Distribution:
+        pmf = numpy.convolve(self._pmf, other.pmf)
+        pmf.flags.writeable = False
+        return Distribution(self._minimum + other.minimum, pmf)
+
+    def advantage(self, advantage: Advantage) -> Distribution:
+        match advantage:
+            case Advantage.adv:
+                cdf = self.cdf * self.cdf
+            case Advantage.dis:
+                survival = 1.0 - self.cdf
+                cdf = 1.0 - survival * survival
+            case _:
+                return self
+        pmf = numpy.diff(cdf, prepend=0.0)
+        pmf.flags.writeable = False
+        return Distribution(self._minimum, pmf)
+
+    def __str__(self):
+        return f'Distribution(minimum:{self.minimum}, maximum:{self.maximum}, mean:{self.mean: 0.3f})'
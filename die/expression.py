@@ -0,0 +1,362 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from math import comb
+import random
+import re
+
+import numpy
+
+from die.distribution import Distribution, dice_pmf
+from die.enums import Advantage
+
+MAX_EXPLOSIONS = 20
+
+_TOKEN = re.compile(r'\s*(?:(?P<number>\d+)|(?P<symbol>kh|kl|k|d|r|!|\+|-))')
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    number: int
+    size: int
+    sign: int = 1
+    keep_highest: int = None
+    keep_lowest: int = None
+    explode: bool = False
+    reroll: int = 0
+
+    @property
+    def plain(self) -> bool:
+        return self.keep_highest is None and self.keep_lowest is None and not self.explode and not self.reroll
+
+    def __str__(self):
+        term = f'{self.number}d{self.size}'
+        if self.reroll:
+            term = f'{term}r{self.reroll}'
+        if self.explode:
+            term = f'{term}!'
+        if self.keep_highest is not None:
+            term = f'{term}kh{self.keep_highest}'
+        if self.keep_lowest is not None:
+            term = f'{term}kl{self.keep_lowest}'
+        return term
+
+    def roll_faces(self, rand_gen: random.Random) -> list[int]:
+        faces = []
+        for die in range(self.number):
+            face = rand_gen.randint(1, self.size)
+            if face <= self.reroll:
+                face = rand_gen.randint(1, self.size)
+            total = face
+            explosions = 0
+            while self.explode and face == self.size and explosions < MAX_EXPLOSIONS:
+                face = rand_gen.randint(1, self.size)
+                total += face
+                explosions += 1
+            faces.append(total)
+        return faces
+
+    def keep(self, faces: list[int]) -> list[int]:
+        if self.keep_highest is not None:
+            return sorted(faces)[len(faces) - self.keep_highest:]
+        if self.keep_lowest is not None:
+            return sorted(faces)[:self.keep_lowest]
+        return faces
+
+    def roll(self, rand_gen: random.Random) -> int:
+        return self.sign * sum(self.keep(self.roll_faces(rand_gen)))
+
+    def roll_batch(self, generator: numpy.random.Generator, shape: tuple[int, ...]) -> numpy.ndarray:
+        faces = generator.integers(1, self.size + 1, size=(*shape, self.number))
+        if self.reroll:
+            rerolled = faces <= self.reroll
+            faces[rerolled] = generator.integers(1, self.size + 1, size=int(rerolled.sum()))
+        if self.explode:
+            exploding = faces == self.size
+            for explosion in range(MAX_EXPLOSIONS):
+                if not exploding.any():
+                    break
+                extra = generator.integers(1, self.size + 1, size=int(exploding.sum()))
+                faces[exploding] += extra
+                still_exploding = numpy.zeros_like(exploding)
+                still_exploding[exploding] = extra == self.size
+                exploding = still_exploding
+        if self.keep_highest is not None:
+            faces = numpy.sort(faces, axis=-1)[..., self.number - self.keep_highest:]
+        elif self.keep_lowest is not None:
+            faces = numpy.sort(faces, axis=-1)[..., :self.keep_lowest]
+        return self.sign * faces.sum(axis=-1)
+
+
+@lru_cache(maxsize=None)
+def face_pmf(size: int, reroll: int = 0, explode: bool = False) -> numpy.ndarray:
+    pmf = numpy.full(size, 1.0 / size)
+    if reroll:
+        pmf = pmf * (reroll / size)
+        pmf[reroll:] += 1.0 / size
+    if explode:
+        tail = numpy.ones(1)
+        for explosion in range(MAX_EXPLOSIONS):
+            next_tail = numpy.zeros(size + len(tail))
+            next_tail[1:size] = 1.0 / size
+            next_tail[size:] += tail / size
+            tail = next_tail
+        exploded = numpy.zeros(size + len(tail))
+        exploded[1:size] = pmf[:size - 1]
+        exploded[size:] += pmf[size - 1] * tail
+        pmf = exploded[1:]
+    pmf.flags.writeable = False
+    return pmf
+
+
+def convolve_power(pmf: numpy.ndarray, number: int) -> numpy.ndarray:
+    if number == 1:
+        return pmf
+    half = number // 2
+    return numpy.convolve(convolve_power(pmf, half), convolve_power(pmf, number - half))
+
+
+def keep_pmf(faces: numpy.ndarray, number: int, keep: int, highest: bool) -> Distribution:
+    values = range(len(faces), 0, -1) if highest else range(1, len(faces) + 1)
+    length = keep * len(faces) + 1
+    states = {0: numpy.zeros(length)}
+    states[0][0] = 1.0
+    for value in values:
+        chance = faces[value - 1]
+        if chance == 0.0:
+            continue
+        next_states = {}
+        for assigned, kept_sums in states.items():
+            for count in range(number - assigned + 1):
+                weight = comb(number - assigned, count) * chance ** count
+                shift = min(count, max(keep - assigned, 0)) * value
+                if assigned + count not in next_states:
+                    next_states[assigned + count] = numpy.zeros(length)
+                next_states[assigned + count][shift:] += weight * kept_sums[:length - shift]
+        states = next_states
+    pmf = states[number]
+    support = numpy.flatnonzero(pmf)
+    return Distribution(int(support[0]), pmf[support[0]:support[-1] + 1])
+
+
+@lru_cache(maxsize=None)
+def term_distribution(term: DiceTerm) -> Distribution:
+    if term.plain:
+        result = Distribution(term.number, dice_pmf(term.number, term.size))
+    else:
+        faces = face_pmf(term.size, term.reroll, term.explode)
+        if term.keep_highest is not None:
+            result = keep_pmf(faces, term.number, term.keep_highest, True)
+        elif term.keep_lowest is not None:
+            result = keep_pmf(faces, term.number, term.keep_lowest, False)
+        else:
+            result = Distribution(term.number, convolve_power(faces, term.number))
+    if term.sign < 0:
+        result = result.negate()
+    return result
+
+
+class DiceExpression:
+    def __init__(self, terms: tuple[DiceTerm, ...], constant: int = 0):
+        self._terms = terms
+        self._constant = constant
+        self._distributions: dict[tuple[Advantage, int], Distribution] = {}
+
+    @property
+    def terms(self) -> tuple[DiceTerm, ...]:
+        return self._terms
+
+    @property
+    def constant(self) -> int:
+        return self._constant
+
+    @property
+    def number(self) -> int:
+        if len(self._terms) == 0:
+            return None
+        return self._terms[0].number
+
+    @property
+    def size(self) -> int:
+        if len(self._terms) == 0:
+            return None
+        return self._terms[0].size
+
+    @cached_property
+    def die_type(self) -> str:
+        die_type = ''
+        for term in self._terms:
+            if term.sign < 0:
+                die_type = f'{die_type}-{term}'
+            elif die_type == '':
+                die_type = f'{term}'
+            else:
+                die_type = f'{die_type}+{term}'
+        return die_type
+
+    @cached_property
+    def text(self) -> str:
+        if self._constant > 0:
+            return f'{self.die_type}+{self._constant}' if self.die_type else f'{self._constant}'
+        elif self._constant < 0:
+            return f'{self.die_type}{self._constant}'
+        return self.die_type or '0'
+
+    @cached_property
+    def dice(self) -> DiceExpression:
+        if self._constant == 0:
+            return self
+        return intern_expression(self._terms, 0)
+
+    def __str__(self):
+        return self.text
+
+    def roll(self, rand_gen: random.Random) -> int:
+        result = self._constant
+        for term in self._terms:
+            result += term.roll(rand_gen)
+        return result
+
+    def roll_faces(self, rand_gen: random.Random) -> (int, list[int]):
+        result = self._constant
+        rolls = []
+        for term in self._terms:
+            faces = term.roll_faces(rand_gen)
+            rolls += [term.sign * face for face in faces]
+            result += term.sign * sum(term.keep(faces))
+        return result, rolls
+
+    def roll_batch(self, generator: numpy.random.Generator, trials: int, advantage: Advantage = None) \
+            -> numpy.ndarray:
+        if advantage is None or advantage is Advantage.no:
+            shape = (trials,)
+        else:
+            shape = (2, trials)
+        results = numpy.full(shape, self._constant, dtype=numpy.int64)
+        for term in self._terms:
+            results += term.roll_batch(generator, shape)
+        match advantage:
+            case Advantage.adv:
+                return results.max(axis=0)
+            case Advantage.dis:
+                return results.min(axis=0)
+        return results
+
+    def distribution(self, advantage: Advantage = None, modifier: int = None) -> Distribution:
+        key = (advantage, modifier)
+        if key not in self._distributions:
+            result = Distribution(self._constant, numpy.ones(1))
+            for term in self._terms:
+                result = result.combine(term_distribution(term))
+            if advantage is not None and advantage is not Advantage.no:
+                result = result.advantage(advantage)
+            if modifier:
+                result = result.shift(modifier)
+            self._distributions[key] = result
+        return self._distributions[key]
+
+
+def tokenize(expression: str) -> list[int or str]:
+    text = expression.lower().rstrip()
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise ValueError(f'\nUnexpected character in dice expression {expression}: {text[position]}')
+        if match.group('number') is not None:
+            tokens.append(int(match.group('number')))
+        else:
+            tokens.append(match.group('symbol'))
+        position = match.end()
+    return tokens
+
+
+def parse_expression(expression: str) -> (tuple[DiceTerm, ...], int):
+    tokens = tokenize(expression)
+    if len(tokens) == 0:
+        raise ValueError(f'\nEmpty dice expression: {expression}')
+    terms = []
+    constant = 0
+    index = 0
+    sign = 1
+    if tokens[0] in ('+', '-'):
+        sign = -1 if tokens[0] == '-' else 1
+        index += 1
+    while True:
+        term, index = parse_term(tokens, index, sign, expression)
+        if isinstance(term, DiceTerm):
+            terms.append(term)
+        else:
+            constant += term
+        if index == len(tokens):
+            break
+        if tokens[index] not in ('+', '-'):
+            raise ValueError(f'\nExpected + or - in dice expression {expression}, found: {tokens[index]}')
+        sign = -1 if tokens[index] == '-' else 1
+        index += 1
+    return tuple(terms), constant
+
+
+def parse_term(tokens: list[int or str], index: int, sign: int, expression: str) -> (DiceTerm or int, int):
+    number = 1
+    if index < len(tokens) and isinstance(tokens[index], int):
+        number = tokens[index]
+        index += 1
+        if index == len(tokens) or tokens[index] != 'd':
+            return sign * number, index
+    if index == len(tokens) or tokens[index] != 'd':
+        raise ValueError(f'\nExpected a number or die in dice expression {expression}')
+    index += 1
+    if index == len(tokens) or not isinstance(tokens[index], int):
+        raise ValueError(f'\nSize of dice is missing from dice expression {expression}')
+    size = tokens[index]
+    index += 1
+    if number < 1:
+        raise ValueError(f'\nNumber of dice is below the minimum of 1: {number}')
+    if size < 2:
+        raise ValueError(f'\nSize of dice is below the minimum of 2: {size}')
+
+    options = {}
+    while index < len(tokens) and tokens[index] in ('kh', 'kl', 'k', 'r', '!'):
+        option = 'kh' if tokens[index] == 'k' else tokens[index]
+        index += 1
+        if option in options:
+            raise ValueError(f'\nDuplicate option {option} in dice expression {expression}')
+        if option == '!':
+            options[option] = True
+            continue
+        if index == len(tokens) or not isinstance(tokens[index], int):
+            raise ValueError(f'\nOption {option} is missing a value in dice expression {expression}')
+        options[option] = tokens[index]
+        index += 1
+
+    if 'kh' in options and 'kl' in options:
+        raise ValueError(f'\nCannot keep both highest and lowest dice: {expression}')
+    keep = options.get('kh', options.get('kl'))
+    if keep is not None and not 1 <= keep <= number:
+        raise ValueError(f'\nNumber of dice to keep must be between 1 and {number}: {keep}')
+    reroll = options.get('r', 0)
+    if reroll >= size:
+        raise ValueError(f'\nReroll threshold must be below the size of dice {size}: {reroll}')
+
+    return DiceTerm(
+        number=number,
+        size=size,
+        sign=sign,
+        keep_highest=options.get('kh'),
+        keep_lowest=options.get('kl'),
+        explode=options.get('!', False),
+        reroll=reroll
+    ), index
+
+
+@lru_cache(maxsize=4096)
+def intern_expression(terms: tuple[DiceTerm, ...], constant: int) -> DiceExpression:
+    return DiceExpression(terms, constant)
+
+
+@lru_cache(maxsize=4096)
+def compile_expression(expression: str) -> DiceExpression:
+    terms, constant = parse_expression(expression)
+    return intern_expression(terms, constant)
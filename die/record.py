@@ -0,0 +1,36 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+from die.enums import Advantage
+
+
+@dataclass(frozen=True)
+class RollRecord:
+    total: int
+    rolls: tuple[int, ...] = ()
+    modifier: int = 0
+    advantage: Advantage = Advantage.no
+    branches: tuple[RollRecord, ...] = ()
+
+    @property
+    def result(self) -> int:
+        return self.total + self.modifier
+
+    def with_modifier(self, modifier: int) -> RollRecord:
+        return replace(self, modifier=self.modifier + modifier)
+
+    @cached_property
+    def text(self) -> str:
+        if self.advantage is Advantage.no:
+            analysis = f"Total:{self.total}, Rolls:({', '.join(str(roll) for roll in self.rolls)})"
+        else:
+            first, second = self.branches
+            label = 'Advantage' if self.advantage is Advantage.adv else 'Disadvantage'
+            analysis = f'First roll:{first}\nSecond roll:{second}\n{label}: {self.total}'
+        if self.modifier:
+            analysis = f'{analysis}. Modifier: {self.modifier}'
+        return analysis
+
+    def __str__(self):
+        return self.text
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import zlib
+
+import numpy
+
+MASK_64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def mix(value: int) -> int:
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+class DiceStream:
+    def __init__(self, seed: int, counter: int = 0):
+        self._seed = seed
+        self._counter = counter
+        self._key = mix(seed & MASK_64)
+        self._dice = {}
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def counter(self) -> int:
+        return self._counter
+
+    def getstate(self) -> tuple[int, int]:
+        return self._seed, self._counter
+
+    def setstate(self, state: tuple[int, int]):
+        seed, counter = state
+        self._seed = seed
+        self._counter = counter
+        self._key = mix(seed & MASK_64)
+
+    def next_64(self) -> int:
+        self._counter += 1
+        return mix((self._key + self._counter * GOLDEN_GAMMA) & MASK_64)
+
+    def randint(self, a: int, b: int) -> int:
+        span = b - a + 1
+        limit = (1 << 64) - (1 << 64) % span
+        value = self.next_64()
+        while value >= limit:
+            value = self.next_64()
+        return a + value % span
+
+    @property
+    def interned_dice(self) -> dict:
+        return self._dice
+
+    def substream(self, index: int) -> DiceStream:
+        return DiceStream(mix((self._key ^ mix((index * GOLDEN_GAMMA) & MASK_64)) & MASK_64))
+
+    def named_substream(self, name: str) -> DiceStream:
+        return self.substream(zlib.crc32(name.encode()) | 1 << 32)
+
+    def spawn_generator(self) -> numpy.random.Generator:
+        return numpy.random.default_rng(self.next_64())
+
+    def __str__(self):
+        return f'DiceStream(seed:{self._seed}, counter:{self._counter})'
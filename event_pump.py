@@ -0,0 +1,36 @@
+from typing import Iterable
+
+import tcod
+from tcod.context import Context
+
+from menus import Menu
+
+
+class EventPump:
+    def __init__(self, menus: dict[str, Menu]):
+        self._menus = menus
+        self._events = 0
+
+    @property
+    def events(self) -> int:
+        return self._events
+
+    @property
+    def focused(self) -> Menu or None:
+        menus = [menu for menu in self._menus.values() if menu.activated and not menu.paused]
+        return max(menus, key=lambda menu: menu.activated_at, default=None)
+
+    def dispatch(self, events: Iterable[tcod.event.Event], context: Context = None) -> int:
+        handled = 0
+        for event in events:
+            if context is not None:
+                context.convert_event(event)
+            menu = self.focused
+            if menu is not None:
+                menu.handle_event(event)
+                handled += 1
+        self._events += handled
+        return handled
+
+    def pump(self, timeout: float, context: Context = None) -> int:
+        return self.dispatch(tcod.event.wait(timeout), context)
@@ -0,0 +1,63 @@
+from tile_grid import TileGrid
+
+OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1)
+)
+
+
+class FieldOfView:
+    def __init__(self, tiles: TileGrid):
+        self._tiles = tiles
+        self._revision = -1
+        self._transparent: list[bool] = []
+
+    def _prepare(self):
+        if self._revision != self._tiles.revision:
+            self._revision = self._tiles.revision
+            self._transparent = self._tiles.passable.ravel().tolist()
+
+    def visible_tiles(self, origin: tuple[int, int], radius: int) -> frozenset[tuple[int, int]]:
+        if origin not in self._tiles:
+            return frozenset()
+        self._prepare()
+        visible = {origin}
+        for xx, xy, yx, yy in OCTANTS:
+            self._cast_light(visible, origin, radius, 1, 1.0, 0.0, xx, xy, yx, yy)
+        return frozenset(visible)
+
+    def _cast_light(self, visible: set[tuple[int, int]], origin: tuple[int, int], radius: int, row: int,
+                    start: float, end: float, xx: int, xy: int, yx: int, yy: int):
+        if start < end:
+            return
+        width, height = self._tiles.size
+        transparent = self._transparent
+        origin_x, origin_y = origin
+        radius_squared = radius * radius
+        new_start = start
+        for distance in range(row, radius + 1):
+            dy = -distance
+            blocked = False
+            for dx in range(-distance, 1):
+                left_slope, right_slope = (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                x, y = origin_x + dx * xx + dy * xy, origin_y + dx * yx + dy * yy
+                in_bounds = 0 <= x < width and 0 <= y < height
+                if in_bounds and dx * dx + dy * dy <= radius_squared:
+                    visible.add((x, y))
+                opaque = not in_bounds or not transparent[x * height + y]
+                if blocked:
+                    if opaque:
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif opaque and distance < radius:
+                    blocked = True
+                    self._cast_light(visible, origin, radius, distance + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
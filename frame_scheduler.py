@@ -0,0 +1,79 @@
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FrameStats:
+    frame: int = 0
+    frame_time: float = 0.0
+    work_time: float = 0.0
+    sleep_time: float = 0.0
+    skipped: int = 0
+    idle: bool = False
+
+    @property
+    def fps(self) -> float:
+        return 1.0 / self.frame_time if self.frame_time > 0 else 0.0
+
+    @property
+    def load(self) -> float:
+        return self.work_time / self.frame_time if self.frame_time > 0 else 0.0
+
+
+class FrameScheduler:
+    def __init__(self, fps: int, *, uncapped: bool = False, idle_fps: int = 30, max_skip: int = 4,
+                 clock=time.perf_counter, sleep=time.sleep):
+        if not uncapped and fps < 1:
+            raise ValueError(f'\nFrame rate is below the minimum of 1: {fps}')
+        if idle_fps < 1:
+            raise ValueError(f'\nIdle frame rate is below the minimum of 1: {idle_fps}')
+        if max_skip < 0:
+            raise ValueError(f'\nMaximum frame skip is below the minimum of 0: {max_skip}')
+        self._budget = 0.0 if uncapped else 1.0 / fps
+        self._idle_budget = max(self._budget, 1.0 / idle_fps)
+        self._max_skip = max_skip
+        self._clock = clock
+        self._sleep = sleep
+        self._deadline: float = None
+        self._frame_start: float = None
+        self._skipping = False
+        self._skip_run = 0
+        self._stats = FrameStats()
+
+    @property
+    def budget(self) -> float:
+        return self._budget
+
+    @property
+    def stats(self) -> FrameStats:
+        return self._stats
+
+    def begin_frame(self) -> bool:
+        now = self._clock()
+        if self._deadline is None:
+            self._deadline = now
+        frame_time = now - self._frame_start if self._frame_start is not None else 0.0
+        self._frame_start = now
+        self._stats = FrameStats(self._stats.frame + 1, frame_time, self._stats.work_time, self._stats.sleep_time,
+                                 self._stats.skipped, self._stats.idle)
+        late = now - self._deadline
+        self._skipping = self._budget > 0 and late > self._budget and self._skip_run < self._max_skip
+        if self._skipping:
+            self._skip_run += 1
+        else:
+            self._skip_run = 0
+        return not self._skipping
+
+    def end_frame(self, drawn: bool = True):
+        now = self._clock()
+        work_time = now - self._frame_start
+        idle = not drawn and not self._skipping
+        budget = self._idle_budget if idle else self._budget
+        self._deadline += budget
+        if now - self._deadline > budget * (self._max_skip + 1):
+            self._deadline = now
+        sleep_time = 0.0 if self._skipping else max(self._deadline - now, 0.0)
+        if sleep_time > 0:
+            self._sleep(sleep_time)
+        self._stats = FrameStats(self._stats.frame, self._stats.frame_time, work_time, sleep_time,
+                                 self._stats.skipped + self._skipping, idle)
@@ -7,6 +7,7 @@ from map_renderer import MapRenderer
 from map_token import CreatureToken
 from menus import Menu
 from room import Room
+from swap_chain import SwapChain
 from turn_tracker import TurnTracker
 
 
@@ -25,4 +26,5 @@ class GameState:
     renderer: MapRenderer
     console: Console
     data_table: dict[str: any]
+    frames: SwapChain = None
 
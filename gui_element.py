@@ -3,7 +3,21 @@ from abc import abstractmethod, ABC
 import tcod
 
 
+def regions_overlap(first: tuple[int, int, int, int], second: tuple[int, int, int, int]) -> bool:
+    x, y, width, height = first
+    other_x, other_y, other_width, other_height = second
+    return x < other_x + other_width and other_x < x + width and y < other_y + other_height and other_y < y + height
+
+
+def text_region(position: tuple[int, int], text: str, width: int = 0, height: int = 0) -> tuple[int, int, int, int]:
+    lines = text.split('\n')
+    return (*position, max(width, max(len(line) for line in lines)), max(height, len(lines)))
+
+
 class GuiElement(ABC):
+    _drawn_state = None
+    _drawn_region = None
+
     @property
     @abstractmethod
     def activated(self) -> bool: pass
@@ -58,3 +72,25 @@ class GuiElement(ABC):
 
     @abstractmethod
     def render(self): pass
+
+    def render_state(self, *args) -> tuple:
+        return self.activated, self.position, self.width, self.height, args
+
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        return (*self.position, self.width, self.height)
+
+    @property
+    def drawn_region(self) -> tuple[int, int, int, int]:
+        return self._drawn_region
+
+    def dirty(self, *args) -> bool:
+        return self._drawn_state is None or self.render_state(*args) != self._drawn_state
+
+    def mark_drawn(self, *args):
+        self._drawn_state = self.render_state(*args)
+        self._drawn_region = self.region
+
+    def forget_drawn(self):
+        self._drawn_state = None
+        self._drawn_region = None
@@ -0,0 +1,106 @@
+import argparse
+import time
+from dataclasses import dataclass
+
+import tcod
+
+from event_pump import EventPump
+from game_state import GameState
+from main import init_menus, init_player, init_renderer, init_room, init_tracker
+
+DEFAULT_SCRIPT = (
+    (tcod.event.KeySym.RETURN, tcod.event.KeySym.RIGHT, tcod.event.KeySym.RETURN),
+    (tcod.event.KeySym.RETURN, tcod.event.KeySym.DOWN, tcod.event.KeySym.RETURN)
+)
+
+
+class NullConsole:
+    def __init__(self, width: int = 80, height: int = 50):
+        self._width = width
+        self._height = height
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    def print(self, *args, **kwargs): pass
+
+    def draw_rect(self, *args, **kwargs): pass
+
+    def clear(self, *args, **kwargs): pass
+
+
+@dataclass(frozen=True)
+class HeadlessReport:
+    turns: int
+    events: int
+    elapsed: float
+
+    @property
+    def turns_per_second(self) -> float:
+        return self.turns / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def key_event(sym: tcod.event.KeySym) -> tcod.event.KeyDown:
+    return tcod.event.KeyDown(scancode=tcod.event.Scancode.UNKNOWN, sym=sym, mod=tcod.event.Modifier.NONE)
+
+
+def init_headless_game(console: NullConsole = None) -> GameState:
+    if console is None:
+        console = NullConsole()
+    room = init_room()
+    player = init_player(room.tiles)
+    room.add_token(player)
+    game_state = GameState(
+        True,
+        False,
+        0,
+        True,
+        {},
+        {},
+        [room],
+        0,
+        init_tracker(player),
+        player,
+        init_renderer(),
+        console,
+        {}
+    )
+    init_menus(game_state, console)
+    game_state.renderer.load_room(room)
+    game_state.renderer.load_entities(game_state.turn_tracker.tokens.values())
+    game_state.renderer.activate()
+    game_state.menus['play'].activate()
+    return game_state
+
+
+def run(game_state: GameState, turns: int,
+        script: tuple[tuple[tcod.event.KeySym, ...], ...] = DEFAULT_SCRIPT) -> HeadlessReport:
+    if turns < 0:
+        raise ValueError(f'\nTurn count is below the minimum of 0: {turns}')
+    pump = EventPump(game_state.menus)
+    scripted_events = [[key_event(sym) for sym in keys] for keys in script] if len(script) > 0 else [[]]
+    turn = 0
+    start = time.perf_counter()
+    while turn < turns and game_state.running:
+        pump.dispatch(scripted_events[turn % len(scripted_events)])
+        current_room = game_state.rooms[game_state.current_room]
+        game_state.turn_tracker.process_turn(current_room, [game_state.player.position] + current_room.stairs(),
+                                             game_state.player)
+        game_state.renderer.sync_room()
+        turn += 1
+    return HeadlessReport(turn, pump.events, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the game without a window using scripted input.')
+    parser.add_argument('-t', '--turns', dest='turns', default=1000, type=int, help='Set the number of turns to run')
+    args = parser.parse_args()
+
+    report = run(init_headless_game(), args.turns)
+    print(f'{report.turns} turns, {report.events} events in {report.elapsed:0.3f}s '
+          f'({report.turns_per_second:0.1f} turns/s)')
@@ -1,6 +1,6 @@
 import tcod
 
-from gui_element import GuiElement
+from gui_element import GuiElement, text_region
 from map_token import CreatureToken
 from character_sheet.enums import AbilityScore
 from menus import Menu
@@ -53,6 +53,7 @@ class InfoTab(GuiElement):
         self._player_data: list[str] = []
         self._menu_data: list[tuple[str, str]] = []
         self._game_data: list[str] = []
+        self._text = ''
 
     @property
     def player_data(self) -> list[str]:
@@ -132,19 +133,31 @@ class InfoTab(GuiElement):
 
     def fetch_player_data(self, key: str, player: CreatureToken, layer: int) -> str: pass
 
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        return text_region(self._position, self._text)
+
+    def render_state(self, menus: dict[str: Menu] = None, player: CreatureToken = None,
+                     data_table: dict[str: any] = None) -> tuple:
+        return self._activated, self._position, self.text(menus, player, data_table)
+
     def render(self, menus: dict[str: Menu], player: CreatureToken, data_table: dict[str: any]):
         if self._activated:
-            data_to_display = []
-            for key, menu in self._menu_data:
-                data_to_display.append(fetch_menu_data(menu, menus.menus[key], 0))
-            for item in self._player_data:
-                data_to_display.append(self.fetch_player_data(item, player, 0))
-            for item in self._game_data:
-                data_to_display.append(fetch_game_data(item, data_table[item], 0))
-            text_to_print = ''
-            for item in data_to_display:
-                if item is None:
-                    continue
-                text_to_print = f'{text_to_print}\n{item}'
             x, y = self._position
-            self._console.print(x=x, y=y, string=text_to_print)
+            self._text = self.text(menus, player, data_table)
+            self._console.print(x=x, y=y, string=self._text)
+
+    def text(self, menus: dict[str: Menu], player: CreatureToken, data_table: dict[str: any]) -> str:
+        data_to_display = []
+        for key, menu in self._menu_data:
+            data_to_display.append(fetch_menu_data(menu, menus.menus[key], 0))
+        for item in self._player_data:
+            data_to_display.append(self.fetch_player_data(item, player, 0))
+        for item in self._game_data:
+            data_to_display.append(fetch_game_data(item, data_table[item], 0))
+        text_to_print = ''
+        for item in data_to_display:
+            if item is None:
+                continue
+            text_to_print = f'{text_to_print}\n{item}'
+        return text_to_print
@@ -6,7 +6,7 @@ from tcod import Console
 from character_sheet import CharacterSheet, StatBlock, Equipment, Armor, Weapon
 from character_sheet.enums import AbilityScore, EquipmentSlot
 from color import Color
-from die import Dice
+from die import Dice, DiceStream, registry
 from game_state import GameState
 from map_renderer import MapRenderer
 from map_token import CreatureToken
@@ -28,22 +28,10 @@ class Loadable(ABC):
 class RoomLoader(Loadable):
     @classmethod
     def encode(cls, obj: Room) -> dict[str, any]:
-        rows = obj.stringify().split(sep='\n')
-        while '' in rows:
-            rows.remove('')
-        height = len(rows)
-        width = len(rows[0])
-        tile_map = []
-        for row in range(height):
-            column = []
-            for tile in range(width):
-                column.append(f'{rows[row][tile]}')
-            tile_map.append(column.copy())
-
         return {
             'seed': obj.seed,
             'tile_set': obj.tile_set,
-            'tile_map': tile_map
+            'tile_map': obj.tile_map()
         }
 
     @classmethod
@@ -133,7 +121,7 @@ class EquipmentLoader(Loadable):
                 'type': 'Weapon',
                 'name': obj.name,
                 'equipment_slot': obj.equipment_slot.name,
-                'roll_type': f'{obj.die_type}{obj.modifier}',
+                'roll_type': obj.roll_type,
                 'damage_type': obj.damage_type,
                 'zweihand': obj.zweihand,
                 'restrictions': obj.restrictions
@@ -177,6 +165,7 @@ class CharacterSheetLoader(Loadable):
            'race': RaceLoader.encode(obj.race),
            'role': obj.role,
            'dice': dice,
+           'stream': obj.stream.getstate(),
            'equipment': equipment,
            'inventory': inventory,
            'hp': obj.hp,
@@ -185,14 +174,21 @@ class CharacterSheetLoader(Loadable):
 
     @classmethod
     def decode(cls, encoded: dict[str, any]) -> CharacterSheet:
+        stream = None
+        if 'stream' in encoded:
+            stream = DiceStream(*encoded['stream'])
         sheet = CharacterSheet(
             StatBlockLoader.decode(encoded['ability_scores']),
             RaceLoader.decode(encoded['race']),
-            encoded['role']
+            encoded['role'],
+            stream
         )
         dice = {}
         for die in encoded['dice'].keys():
-            dice[die] = Dice(die, encoded['dice'][die])
+            if stream is not None:
+                dice[die] = registry.dice(die, stream)
+            else:
+                dice[die] = Dice(die, encoded['dice'][die])
         equipment = {}
         for key in encoded['equipment'].keys():
             if encoded['equipment'][key] is not None:
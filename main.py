@@ -1,7 +1,6 @@
 import argparse
 import json
 import threading
-import time
 
 import tcod
 from tcod.tileset import Tileset
@@ -9,16 +8,19 @@ from tcod.tileset import Tileset
 from character_sheet import CharacterSheet, StatBlock
 from character_sheet.enums import ability_score_iterator, AbilityScore
 from color import Color
+from event_pump import EventPump
+from frame_scheduler import FrameScheduler
 from game_state import GameState
-from gui_element import GuiElement
+from gui_element import GuiElement, regions_overlap
+from info_tab import InfoTab
 from loadable import decode_ability_score, load_races
 from map_renderer import MapRenderer
 from map_token import CreatureToken
-from menus import ListedMenu, Menu, MovementMenu
+from menus import ListedMenu, MovementMenu
 import menu_commands
 from room import Room
-from status_tab import StatusTab
-from tile import Tile
+from swap_chain import SwapChain
+from tile_grid import TileGrid
 from turn_tracker import TurnTracker
 
 
@@ -32,6 +34,7 @@ def init_parser():
 def init_game():
     room = init_room()
     player = init_player(room.tiles)
+    room.add_token(player)
     tcod_tile_set = tcod.tileset.load_tilesheet(
         "assets/dejavu10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
     )
@@ -92,8 +95,8 @@ def init_renderer():
     return renderer
 
 
-def init_player(tiles: dict[tuple[int, int], Tile]):
-    player_start = [position for position in tiles.keys() if tiles[position].icon == 3][0]
+def init_player(tiles: TileGrid):
+    player_start = tiles.find_icon(3)[0]
     scores = {}
     race_modifiers = {}
     for score in ability_score_iterator():
@@ -111,54 +114,116 @@ def init_tracker(token: CreatureToken):
     return new_tracker
 
 
+def init_menus(game_state: GameState, console: tcod.Console):
+    main_menu = ListedMenu((int((console.width - 14)/2), 10), (14, 20), console)
+    main_menu.add_command(game_state, name='new game', command=menu_commands.new_game)
+    main_menu.add_command(game_state, name='load game', command=menu_commands.load_game)
+    main_menu.add_command(game_state, name='map editor', command=menu_commands.launch_map_editor)
+    main_menu.add_command(game_state, name='quit', command=menu_commands.quit_game)
+
+    selection = MovementMenu((16, 22), (40, 10), console)
+    selection.add_command(game_state, name='quit', command=menu_commands.quit_game)
+    selection.add_command(game_state, name='cancel', command=menu_commands.cancel_selection)
+    selection.add_command(game_state, name='confirm', command=menu_commands.confirm_selection)
+
+    play_menu = ListedMenu((0, 10), (14, 5), console)
+    play_menu.add_command(game_state, name='quit', command=menu_commands.quit_game, hidden=True)
+    play_menu.add_command(game_state, name='pause', command=menu_commands.open_pause_menu, hidden=True,
+                          override=tcod.event.K_ESCAPE)
+    play_menu.add_command(game_state, name='move', command=menu_commands.open_movement_menu)
+    play_menu.add_command(game_state, name='interact', command=menu_commands.open_interaction_menu)
+    play_menu.add_command(game_state, name='attack', command=menu_commands.open_attack_menu)
+
+    pause_menu = ListedMenu((int((console.width - 14)/2), 10), (14, 20), console)
+    pause_menu.add_command(game_state, name='quit', command=menu_commands.quit_game, hidden=True)
+    pause_menu.add_command(game_state, name='unpause', command=menu_commands.close_pause_menu, override=tcod.event.K_ESCAPE)
+    pause_menu.add_command(game_state, name='save', command=menu_commands.save_game)
+    pause_menu.add_command(game_state, name='load', command=menu_commands.load_game)
+    pause_menu.add_command(game_state, name='exit', command=menu_commands.return_to_tile)
+
+    game_state.menus['main'] = main_menu
+    game_state.menus['selection'] = selection
+    game_state.menus['play'] = play_menu
+    game_state.menus['pause'] = pause_menu
+
+
 def render_loop(current_game_state: GameState, void: None = None):
-    if current_game_state.fps_uncapped:
-        fps = 1000000
-    elif current_game_state.fps:
-        fps = current_game_state.fps
-    else:
-        fps = 30
-    time_delta = 1.0 / fps
-    t1, t2 = 1.0, 2.0
+    scheduler = FrameScheduler(current_game_state.fps or 30, uncapped=current_game_state.fps_uncapped)
+
+    drawn: dict[GuiElement, tuple[int, int, int, int]] = {}
+    fps_region = None
 
     while current_game_state.running:
-        console = current_game_state.console
+        if not scheduler.begin_frame():
+            scheduler.end_frame()
+            continue
         renderer = current_game_state.renderer
-        menu_names = current_game_state.menus.keys()
-        menus: list[Menu] = [m for m in current_game_state.menus.values() if m.activated]
-        gui_elements: [GuiElement] = [m for m in current_game_state.gui_elements.values() if m.activated]
-        renderer.render()
-        for element_to_render in gui_elements:
-            if isinstance(element_to_render, StatusTab):
-                element_to_render.render()
-            else:
-                element_to_render.render(current_game_state.menus, current_game_state.player, current_game_state.data_table)
-        for menu_to_render in menus:
-            if 'selection' in menu_names and menu_to_render is current_game_state.menus['selection']:
-                renderer.curser = menu_to_render.curser
-                if menu_to_render.curser in current_game_state.rooms[current_game_state.current_room].tiles and renderer.activated:
-                    hovered_tile = current_game_state.rooms[current_game_state.current_room].tiles[menu_to_render.curser].description
-                    menu_to_render.render(hovered_tile)
+        if 'selection' in current_game_state.menus.keys() and current_game_state.menus['selection'].activated:
+            renderer.curser = current_game_state.menus['selection'].curser
+            renderer.follow(current_game_state.menus['selection'].curser)
+        renderer.sync_room()
+
+        elements: list[GuiElement] = [renderer] if renderer.activated else []
+        elements += [m for m in current_game_state.gui_elements.values() if m.activated]
+        elements += [m for m in current_game_state.menus.values() if m.activated]
+        arguments = {element: render_arguments(current_game_state, element) for element in elements}
+        visible = [element for element in elements if arguments[element] is not None]
+
+        dirty_regions = []
+        for element in [element for element in drawn.keys() if element not in visible]:
+            dirty_regions.append(drawn.pop(element))
+            element.forget_drawn()
+        dirty = [element for element in visible if element.dirty(*arguments[element])]
+        for element in dirty:
+            if element in drawn:
+                dirty_regions.append(drawn[element])
+            dirty_regions.append(element.region)
+
+        if len(dirty_regions) != 0:
+            frames = current_game_state.frames
+            console = frames.acquire() if frames is not None else current_game_state.console
+            if fps_region is not None:
+                dirty_regions.append(fps_region)
+            for x, y, width, height in dirty_regions:
+                console.draw_rect(x, y, width, height, ord(' '), fg=(255, 255, 255), bg=(0, 0, 0))
+            for element in visible:
+                if element in dirty or any(regions_overlap(element.region, region) for region in dirty_regions):
+                    element.canvas = console
+                    element.render(*arguments[element])
+                    element.mark_drawn(*arguments[element])
+                    drawn[element] = element.drawn_region
+                    dirty_regions.append(element.drawn_region)
+
+            stats = scheduler.stats
+            if stats.load < 0.5:
+                fps_color = (255, 255, 255)
+            elif stats.load < 0.9:
+                fps_color = (255, 255, 0)
             else:
-                menu_to_render.render()
-        t2 = time.time()
-        delta_time = 1.0 / (t2 - t1)
+                fps_color = (255, 0, 0)
 
-        if delta_time >= fps / 2:
-            fps_color = (255, 255, 255)
-        elif delta_time >= fps / 5:
-            fps_color = (255, 255, 0)
-        else:
-            fps_color = (255, 0, 0)
+            fps_text = f'FPS:{stats.fps: 0.2f} {stats.work_time * 1000:0.1f}ms'
+            fps_region = (int(console.width / 2) - len(fps_text) + 1, 0, len(fps_text), 1)
+            console.print(x=int(console.width / 2), y=0, string=fps_text, fg=fps_color, alignment=2)
+            if frames is not None:
+                frames.publish(console)
+        scheduler.end_frame(len(dirty_regions) != 0)
 
-        console.print(x=int(console.width / 2), y=0, string=f'FPS:{delta_time: 0.2f}', fg=fps_color, alignment=2)
-        t1 = time.time()
-        time.sleep(time_delta)
-        console.clear()
+
+def render_arguments(current_game_state: GameState, element: GuiElement) -> tuple or None:
+    if isinstance(element, InfoTab):
+        return current_game_state.menus, current_game_state.player, current_game_state.data_table
+    if 'selection' in current_game_state.menus.keys() and element is current_game_state.menus['selection']:
+        current_room = current_game_state.rooms[current_game_state.current_room]
+        if element.curser in current_room.tiles and current_game_state.renderer.activated:
+            return (current_room.tiles[element.curser].description,)
+        return None
+    return ()
 
 
 def game_loop(current_game_state: GameState, tcod_tile_set: Tileset):
     console = current_game_state.console
+    frames = current_game_state.frames
     with tcod.context.new_terminal(
             console.width,
             console.height,
@@ -166,11 +231,10 @@ def game_loop(current_game_state: GameState, tcod_tile_set: Tileset):
             title="Yet Another Roguelike Game",
             vsync=True,
     ) as context:
+        pump = EventPump(current_game_state.menus)
         while current_game_state.running:
-            menus: list[Menu] = [m for m in current_game_state.menus.values() if m.activated and not m.paused]
-            context.present(console)
-            for menu_to_process in menus:
-                menu_to_process.process(current_game_state.fps, context)
+            context.present(frames.front() if frames is not None else console)
+            pump.pump(1.0 / (current_game_state.fps or 30), context)
 
 
 if __name__ == '__main__':
@@ -199,46 +263,18 @@ if __name__ == '__main__':
         player_token,
         game_renderer,
         root_console,
-        {'races': load_races()}
+        {'races': load_races()},
+        SwapChain(root_console)
     )
-    main_menu = ListedMenu((int((root_console.width - 14)/2), 10), (14, 20), root_console)
-    main_menu.add_command(game_state, name='new game', command=menu_commands.new_game)
-    main_menu.add_command(game_state, name='load game', command=menu_commands.load_game)
-    main_menu.add_command(game_state, name='map editor', command=menu_commands.launch_map_editor)
-    main_menu.add_command(game_state, name='quit', command=menu_commands.quit_game)
-
-    selection = MovementMenu((16, 22), (40, 10), root_console)
-    selection.add_command(game_state, name='quit', command=menu_commands.quit_game)
-    selection.add_command(game_state, name='cancel', command=menu_commands.cancel_selection)
-    selection.add_command(game_state, name='confirm', command=menu_commands.confirm_selection)
-
-    play_menu = ListedMenu((0, 10), (14, 5), root_console)
-    play_menu.add_command(game_state, name='quit', command=menu_commands.quit_game, hidden=True)
-    play_menu.add_command(game_state, name='pause', command=menu_commands.open_pause_menu, hidden=True,
-                          override=tcod.event.K_ESCAPE)
-    play_menu.add_command(game_state, name='move', command=menu_commands.open_movement_menu)
-    play_menu.add_command(game_state, name='interact', command=menu_commands.open_interaction_menu)
-    play_menu.add_command(game_state, name='attack', command=menu_commands.open_attack_menu)
-
-    pause_menu = ListedMenu((int((root_console.width - 14)/2), 10), (14, 20), root_console)
-    pause_menu.add_command(game_state, name='quit', command=menu_commands.quit_game, hidden=True)
-    pause_menu.add_command(game_state, name='unpause', command=menu_commands.close_pause_menu, override=tcod.event.K_ESCAPE)
-    pause_menu.add_command(game_state, name='save', command=menu_commands.save_game)
-    pause_menu.add_command(game_state, name='load', command=menu_commands.load_game)
-    pause_menu.add_command(game_state, name='exit', command=menu_commands.return_to_tile)
-
-    game_state.menus['main'] = main_menu
-    game_state.menus['selection'] = selection
-    game_state.menus['play'] = play_menu
-    game_state.menus['pause'] = pause_menu
+    init_menus(game_state, root_console)
     game_state.renderer.canvas = root_console
-    game_state.renderer.load_tiles(game_state.rooms[0].stringify())
+    game_state.renderer.load_room(game_state.rooms[0])
     game_state.renderer.load_entities(game_state.turn_tracker.tokens.values())
 
     render_thread = threading.Thread(target=render_loop, args=(game_state, None))
     control_thread = threading.Thread(target=game_loop, args=(game_state, game_tcod_tile_set))
 
-    main_menu.activate()
+    game_state.menus['main'].activate()
     render_thread.start()
     control_thread.start()
     control_thread.join()
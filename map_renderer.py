@@ -1,9 +1,42 @@
+import numpy
 import tcod
 from tcod import Console
 
 from color import Color
 from gui_element import GuiElement
 from map_token import CreatureToken
+from render_layers import Compositor, RenderLayer
+from room import Room
+
+NORTH, EAST, SOUTH, WEST = 1, 2, 4, 8
+SAMPLE_BITS = (NORTH, EAST, SOUTH, WEST)
+
+
+def sample_mask(sample: str) -> int:
+    return sum(bit for bit, match in zip(SAMPLE_BITS, sample) if match == 't')
+
+
+def console_grid(console: Console) -> numpy.ndarray:
+    grid = console.rgb
+    if grid.shape == (console.width, console.height) and (console.width != console.height or grid.flags.f_contiguous):
+        return grid
+    return grid.T
+
+
+def index_arrays(positions: list[tuple[int, int]]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    if positions is None or len(positions) == 0:
+        return numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0, dtype=numpy.intp)
+    points = numpy.array(list(positions), dtype=numpy.intp).reshape(-1, 2)
+    return points[:, 0], points[:, 1]
+
+
+def neighbor_masks(same: numpy.ndarray) -> numpy.ndarray:
+    masks = numpy.zeros(same.shape, dtype=numpy.uint8)
+    masks[1:, :][same[:-1, :]] |= NORTH
+    masks[:, :-1][same[:, 1:]] |= EAST
+    masks[:-1, :][same[1:, :]] |= SOUTH
+    masks[:, 1:][same[:, :-1]] |= WEST
+    return masks
 
 
 class MapRenderer(GuiElement):
@@ -17,11 +50,30 @@ class MapRenderer(GuiElement):
         self._paused = False
         self._activated = False
         self.rules = {}
+        self._lookup: dict[str, list[tuple[str, Color, Color]]] = {}
+        self._lookup_arrays: dict[str, tuple[numpy.ndarray, ...]] = {}
         self._console = console
-        self._tiles: dict[tuple[int, int]: tuple[str, Color, Color]] = {}
         self._entities:  dict[tuple[int, int]: tuple[str, Color, Color]] = {}
         self._curser: tuple[int, int] = None
         self._highlighted_tiles: list[tuple[int, int]] = None
+        self._rows: list[list[str]] = []
+        self._room: Room = None
+        self._room_size = (0, 0)
+        self._room_revision = 0
+        self._camera = (0, 0)
+        self._version = 0
+        self._terrain = RenderLayer(size)
+        self._overlay = RenderLayer(size, glyphs=False)
+        self._entity_layer = RenderLayer(size)
+        self._cursor_layer = RenderLayer(size)
+        self._compositor = Compositor(size, [self._terrain, self._overlay, self._entity_layer, self._cursor_layer])
+        self._highlight_foreground = numpy.zeros((*size, 3), dtype=numpy.uint8)
+        self._highlight_background = numpy.zeros((*size, 3), dtype=numpy.uint8)
+        self._highlight_index = index_arrays(None)
+        self._entity_index = index_arrays(None)
+        self._entity_glyphs = numpy.zeros(0, dtype=numpy.int32)
+        self._entity_foreground = numpy.zeros((0, 3), dtype=numpy.uint8)
+        self._entity_background = numpy.zeros((0, 3), dtype=numpy.uint8)
 
     @property
     def highlighted_tiles(self) -> list[tuple[int, int]]:
@@ -30,6 +82,13 @@ class MapRenderer(GuiElement):
     @highlighted_tiles.setter
     def highlighted_tiles(self, new_highlighted_tiles: list[tuple[int, int]]):
         self._highlighted_tiles = new_highlighted_tiles
+        self._highlight_index = index_arrays(new_highlighted_tiles)
+        self._refresh_overlay()
+        self._version += 1
+
+    @property
+    def tiles(self) -> dict[tuple[int, int], tuple[str, Color, Color]]:
+        return {position: self._tile_at(position) for position in self._painted()}
 
     @property
     def curser(self) -> tuple[int, int]:
@@ -94,11 +153,14 @@ class MapRenderer(GuiElement):
     def add_rule(self, tile: str, rule: str, sub: str, /, *, foreground: Color = None,
                  background: Color = None):
         if foreground is None:
-            foreground = Color(255, 255, 255)
+            foreground = Color.intern(255, 255, 255)
         if background is None:
-            background = Color(0, 0, 0)
+            background = Color.intern(0, 0, 0)
+        foreground, background = Color.intern(*foreground.components), Color.intern(*background.components)
 
         new_rule = {rule: sub, 'foreground': foreground, 'background': background}
+        self._lookup.pop(tile, None)
+        self._lookup_arrays.pop(tile, None)
         if tile in self.rules.keys():
             if new_rule not in self.rules[tile]:
                 self.rules[tile].append(new_rule)
@@ -110,118 +172,282 @@ class MapRenderer(GuiElement):
         for entity in entities:
             if entity is not None:
                 self._entities[entity.position] = entity.render()
+        self._entity_index = index_arrays(list(self._entities.keys()))
+        self._entity_glyphs = numpy.array([ord(glyph[0]) for glyph, foreground, background in
+                                           self._entities.values()], dtype=numpy.int32)
+        self._entity_foreground = numpy.array([foreground.rgb_array() for glyph, foreground, background in
+                                               self._entities.values()], dtype=numpy.uint8).reshape(-1, 3)
+        self._entity_background = numpy.array([background.rgb_array() for glyph, foreground, background in
+                                               self._entities.values()], dtype=numpy.uint8).reshape(-1, 3)
+        self._refresh_entities()
+        self._version += 1
 
     def load_tiles(self, tiles: str):
-        self._tiles = {}
         rows = tiles.split(sep='\n')
         while '' in rows:
             rows.remove('')
-        height = len(rows)
-        width = len(rows[0])
-
-        for y in range(self._height):
-            if y < len(rows):
-                for x in range(self._width):
-                    if x < len(rows[y]):
-                        tile = rows[y][x]
-                        if tile in self.rules.keys():
-                            self._tiles[(x, y)] = self.apply_rules((x, y), (width, height), rows)
-                    else:
-                        rule = self.rules['E'][0]
-                        self._tiles[(x, y)] = (rule['a'], rule['foreground'], rule['background'])
-            else:
-                for x in range(self._width):
-                    rule = self.rules['E'][0]
-                    self._tiles[(x, y)] = (rule['a'], rule['foreground'], rule['background'])
+        self._room = None
+        self._rows = [list(row) for row in rows]
+        self._load_window((max([len(row) for row in self._rows], default=0), len(self._rows)))
+
+    def load_room(self, room: Room):
+        self._room = room
+        self._room_revision = room.revision
+        self._rows = []
+        self._load_window(room.tiles.size)
+
+    def sync_room(self) -> set[tuple[int, int]]:
+        if self._room is None or self._room_revision == self._room.revision:
+            return set()
+        changes = self._room.changes_since(self._room_revision)
+        if changes is None:
+            self.load_room(self._room)
+            return self._painted()
+        self._room_revision = self._room.revision
+        dirty = set()
+        for x, y in changes:
+            dirty.update([(x, y), (x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)])
+        for position in dirty:
+            self._update_tile(position)
+        self._refresh_overlay()
+        self._version += 1
+        return dirty
+
+    @property
+    def camera(self) -> tuple[int, int]:
+        return self._camera
+
+    @camera.setter
+    def camera(self, new_camera: tuple[int, int]):
+        self.scroll_to(new_camera)
+
+    @property
+    def room_size(self) -> tuple[int, int]:
+        return self._room_size
+
+    def scroll_to(self, position: tuple[int, int]):
+        room_width, room_height = self.room_size
+        camera = (max(min(position[0], room_width - self._width), 0),
+                  max(min(position[1], room_height - self._height), 0))
+        if camera != self._camera:
+            self._camera = camera
+            self._bake_window()
+
+    def scroll(self, dx: int, dy: int):
+        self.scroll_to((self._camera[0] + dx, self._camera[1] + dy))
+
+    def center_on(self, position: tuple[int, int]):
+        self.scroll_to((position[0] - self._width // 2, position[1] - self._height // 2))
+
+    def follow(self, position: tuple[int, int]):
+        x, y = position
+        x_camera, y_camera = self._camera
+        x_camera = min(max(x_camera, x - self._width + 1), x)
+        y_camera = min(max(y_camera, y - self._height + 1), y)
+        self.scroll_to((x_camera, y_camera))
+
+    def in_view(self, position: tuple[int, int]) -> bool:
+        x, y = position
+        return self._camera[0] <= x < self._camera[0] + self._width and \
+            self._camera[1] <= y < self._camera[1] + self._height
+
+    def _load_window(self, room_size: tuple[int, int]):
+        self._room_size = room_size
+        room_width, room_height = room_size
+        self._camera = (max(min(self._camera[0], room_width - self._width), 0),
+                        max(min(self._camera[1], room_height - self._height), 0))
+        self._bake_window()
+
+    def _bake_window(self):
+        self._version += 1
+        self._allocate_layer()
+        x_camera, y_camera = self._camera
+        chars = self._window_chars((x_camera - 1, y_camera - 1), (self._width + 2, self._height + 2))
+
+        painted = []
+        for tile in self.rules.keys():
+            same = chars == tile
+            if not same.any():
+                continue
+            masks = neighbor_masks(same)
+            ys, xs = numpy.nonzero(same[1:-1, 1:-1])
+            tile_masks = masks[ys + 1, xs + 1]
+            glyphs, foreground, background, highlight_foreground, highlight_background = self.lookup_arrays(tile)
+            painted.append((xs, ys, glyphs[tile_masks], foreground[tile_masks], background[tile_masks]))
+            self._highlight_foreground[xs, ys] = highlight_foreground[tile_masks]
+            self._highlight_background[xs, ys] = highlight_background[tile_masks]
+
+        ys, xs = numpy.nonzero(chars[1:-1, 1:-1] == '')
+        if len(xs) > 0:
+            rule = self.rules['E'][0]
+            painted.append((xs, ys, numpy.full(len(xs), ord(rule['a'][0]), dtype=numpy.int32),
+                            numpy.tile(rule['foreground'].rgb_array(), (len(xs), 1)),
+                            numpy.tile(rule['background'].rgb_array(), (len(xs), 1))))
+            self._highlight_foreground[xs, ys] = rule['foreground'].rgb_array(shift=1)
+            self._highlight_background[xs, ys] = rule['background'].rgb_array(shift=1)
+
+        if len(painted) > 0:
+            self._terrain.replace(*(numpy.concatenate(arrays) for arrays in zip(*painted)))
+        else:
+            self._terrain.clear()
+        self._refresh_overlay()
+        self._refresh_entities()
+
+    def _window_chars(self, origin: tuple[int, int], size: tuple[int, int]) -> numpy.ndarray:
+        x_origin, y_origin = origin
+        width, height = size
+        chars = numpy.full((height, width), '', dtype=object)
+        if self._room is not None:
+            window = self._room.char_grid(origin, size).T
+            x_start, y_start = max(-x_origin, 0), max(-y_origin, 0)
+            chars[y_start:y_start + window.shape[0], x_start:x_start + window.shape[1]] = window
+            return chars
+        for y_window in range(height):
+            y = y_origin + y_window
+            if 0 <= y < len(self._rows):
+                row = self._rows[y]
+                x_start, x_end = max(x_origin, 0), min(x_origin + width, len(row))
+                if x_end > x_start:
+                    chars[y_window, x_start - x_origin:x_end - x_origin] = row[x_start:x_end]
+        return chars
+
+    def _tile_at(self, position: tuple[int, int]) -> (str, Color, Color) or None:
+        chars = self._window_chars((position[0] - 1, position[1] - 1), (3, 3))
+        tile = chars[1, 1]
+        if tile == '':
+            rule = self.rules['E'][0]
+            return rule['a'], rule['foreground'], rule['background']
+        if tile not in self.rules.keys():
+            return None
+        return self.lookup_table(tile)[int(neighbor_masks(chars == tile)[1, 1])]
+
+    def _allocate_layer(self):
+        size = (self._width, self._height)
+        if self._compositor.size != size:
+            self._compositor.resize(size)
+            self._highlight_foreground = numpy.zeros((*size, 3), dtype=numpy.uint8)
+            self._highlight_background = numpy.zeros((*size, 3), dtype=numpy.uint8)
+
+    def _painted(self) -> set[tuple[int, int]]:
+        xs, ys = numpy.nonzero(self._terrain.mask)
+        x_camera, y_camera = self._camera
+        return {(x + x_camera, y + y_camera) for x, y in zip(xs.tolist(), ys.tolist())}
+
+    def _bake(self, position: tuple[int, int], tile: (str, Color, Color) or None):
+        local = index_arrays([(position[0] - self._camera[0], position[1] - self._camera[1])])
+        if tile is None:
+            self._terrain.erase(*local)
+            return
+        glyph, foreground, background = tile
+        self._terrain.paint(*local, numpy.array([ord(glyph[0])], dtype=numpy.int32),
+                            foreground.rgb_array(), background.rgb_array())
+        self._highlight_foreground[local] = foreground.rgb_array(shift=1)
+        self._highlight_background[local] = background.rgb_array(shift=1)
+
+    def _window_indices(self, xs: numpy.ndarray, ys: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray,
+                                                                                numpy.ndarray]:
+        xs, ys = xs - self._camera[0], ys - self._camera[1]
+        width, height = self._compositor.size
+        inside = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < height)
+        return xs[inside], ys[inside], inside
+
+    def _refresh_overlay(self):
+        xs, ys, inside = self._window_indices(*self._highlight_index)
+        baked = self._terrain.mask[xs, ys]
+        xs, ys = xs[baked], ys[baked]
+        self._overlay.replace(xs, ys, None, self._highlight_foreground[xs, ys], self._highlight_background[xs, ys])
+
+    def _refresh_entities(self):
+        xs, ys, inside = self._window_indices(*self._entity_index)
+        self._entity_layer.replace(xs, ys, self._entity_glyphs[inside],
+                                   self._entity_foreground[inside], self._entity_background[inside])
+
+    def _refresh_cursor(self):
+        curser = self.curser
+        if curser is None or not self.in_view(curser):
+            self._cursor_layer.clear()
+            return
+        terrain = self._tile_at(curser)
+        if curser in self._entities:
+            tile, foreground, background = self._entities[curser]
+        elif terrain is not None:
+            tile, foreground, background = terrain
+        else:
+            tile = self.block_symbols[0]
+            foreground = Color.intern(1.0, 1.0, 1.0)
+            background = Color.intern(0.0, 0.0, 0.0)
+        if self._highlighted_tiles is not None and curser in self._highlighted_tiles:
+            shifted = 1
+        else:
+            shifted = 0
+        xs, ys, inside = self._window_indices(*index_arrays([curser]))
+        self._cursor_layer.replace(xs, ys, numpy.array([ord(tile[0])], dtype=numpy.int32),
+                                   foreground.rgb_array(invert=True, shift=shifted),
+                                   background.rgb_array(invert=True, shift=shifted))
+
+    def _update_tile(self, position: tuple[int, int]):
+        if not self.in_view(position):
+            return
+        self._bake(position, self._tile_at(position))
+
+    def render_state(self, *args) -> tuple:
+        return self._activated, self._position, self._width, self._height, self._camera, self._curser, self._version
 
     def render(self):
         if self.activated:
-            if self._highlighted_tiles is None:
-                highlighted_tiles = []
-            else:
-                highlighted_tiles = self._highlighted_tiles
-            curser = self.curser
-
+            if self._compositor.size != (self._width, self._height):
+                self._bake_window()
+            self._refresh_cursor()
+            self._compositor.compose()
+            grid = console_grid(self._console)
             x_offset, y_offset = self.position
-
-            for position in self._tiles.keys():
-                x, y = position
-                tile, foreground, background = self._tiles[position]
-                self._console.print(x=x + x_offset,
-                                    y=y + y_offset,
-                                    string=tile,
-                                    fg=foreground.rgb(),
-                                    bg=background.rgb()
-                                    )
-
-            if len(highlighted_tiles) > 0:
-                for position in highlighted_tiles:
-                    x, y = position
-                    tile, foreground, background = self._tiles[position]
-                    self._console.print(x=x + x_offset,
-                                        y=y + y_offset,
-                                        string=tile,
-                                        fg=foreground.rgb(shift=1),
-                                        bg=background.rgb(shift=1)
-                                        )
-
-            if len(self._entities) > 0:
-                for position in self._entities.keys():
-                    x, y = position
-                    tile, foreground, background = self._entities[position]
-                    self._console.print(x=x + x_offset,
-                                        y=y + y_offset,
-                                        string=tile,
-                                        fg=foreground.rgb(),
-                                        bg=background.rgb()
-                                        )
-
-            if curser is not None:
-                x, y = curser
-                if curser in self._entities:
-                    tile, foreground, background = self._entities[curser]
-                elif curser in self._tiles:
-                    tile, foreground, background = self._tiles[curser]
-                else:
-                    tile = self.block_symbols[0]
-                    foreground = Color(1.0, 1.0, 1.0)
-                    background = Color(0.0, 0.0, 0.0)
-                if curser in highlighted_tiles:
-                    shifted = 1
-                else:
-                    shifted = 0
-                self._console.print(x=x + x_offset,
-                                    y=y + y_offset,
-                                    string=tile,
-                                    fg=foreground.rgb(invert=True, shift=shifted),
-                                    bg=background.rgb(invert=True, shift=shifted)
-                                    )
+            width = max(min(self._width, grid.shape[0] - x_offset), 0)
+            height = max(min(self._height, grid.shape[1] - y_offset), 0)
+            view = grid[x_offset:x_offset + width, y_offset:y_offset + height]
+
+            covered = self._compositor.covered[:width, :height]
+            view['ch'][covered] = self._compositor.glyphs[:width, :height][covered]
+            view['fg'][covered] = self._compositor.foreground[:width, :height][covered]
+            view['bg'][covered] = self._compositor.background[:width, :height][covered]
+
+    def lookup_table(self, tile: str) -> list[tuple[str, Color, Color]]:
+        if tile not in self._lookup:
+            rules = self.rules[tile]
+            fixed = next((rule for rule in rules if 'a' in rule), None)
+            if fixed is not None:
+                table = [(fixed['a'], fixed['foreground'], fixed['background'])] * 16
+            else:
+                table = [(tile, Color.intern(1.0, 1.0, 1.0), Color.intern(0.0, 0.0, 0.0))] * 16
+                for mask in range(16):
+                    sample = ''.join('t' if mask & bit else 'f' for bit in SAMPLE_BITS)
+                    rule = next((rule for rule in rules if sample in rule), None)
+                    if rule is not None:
+                        table[mask] = (rule[sample], rule['foreground'], rule['background'])
+            self._lookup[tile] = table
+        return self._lookup[tile]
+
+    def lookup_arrays(self, tile: str) -> tuple[numpy.ndarray, ...]:
+        if tile not in self._lookup_arrays:
+            table = self.lookup_table(tile)
+            foreground = numpy.stack([foreground.palette[0] for glyph, foreground, background in table], axis=0)
+            background = numpy.stack([background.palette[0] for glyph, foreground, background in table], axis=0)
+            self._lookup_arrays[tile] = (
+                numpy.array([ord(glyph[0]) for glyph, foreground, background in table], dtype=numpy.int32),
+                foreground[:, 0], background[:, 0], foreground[:, 1], background[:, 1]
+            )
+        return self._lookup_arrays[tile]
 
     def apply_rules(self, position: tuple[int, int], limits: tuple[int, int], rows: list[list[str]]) -> \
             (str, Color, Color):
         x, y = position
 
         tile = rows[y][x]
-        rules = self.rules[tile]
         x_max, y_max = limits
-        sample = ''
+        mask = 0
         samples = [(x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)]
 
-        for rule in rules:
-            if 'a' in rule:
-                return rule['a'], rule['foreground'], rule['background']
-
-        for count, position in enumerate(samples):
-            x_relative, y_relative = position
-            if 0 <= x_relative < x_max and 0 <= y_relative < y_max:
+        for bit, (x_relative, y_relative) in zip(SAMPLE_BITS, samples):
+            if 0 <= x_relative < x_max and 0 <= y_relative < y_max and x_relative < len(rows[y_relative]):
                 if rows[y_relative][x_relative] == tile:
-                    sample = f'{sample}t'
-                else:
-                    sample = f'{sample}f'
-            else:
-                sample = f'{sample}f'
-
-        for rule in rules:
-            if sample in rule:
-                return rule[sample], rule['foreground'], rule['background']
-        return tile, Color(1.0, 1.0, 1.0), Color(0.0, 0.0, 0.0)
+                    mask |= bit
+        return self.lookup_table(tile)[mask]
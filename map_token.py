@@ -51,13 +51,41 @@ class CreatureToken:
         return self._sheet.roll_initiative()
 
     def render(self):
-        return 'P', Color(0.6, 0.1, 0.2), Color(0.2, 0.1, 0.8)
+        return 'P', Color.intern(0.6, 0.1, 0.2), Color.intern(0.2, 0.1, 0.8)
 
-    def take_turn(self): pass
-
-    def valid_movements(self): pass
-
-    def take_movement_action(self): pass
+    def take_turn(self, room=None, distance_map=None):
+        self._actions = {'standard': True, 'movement': True, 'reaction': True}
+        if room is None or distance_map is None:
+            return
+        movement_points = self.speed
+        new_position = self._position
+        step = room.downhill_step(distance_map, new_position)
+        while step is not None and room.tiles.movement_cost[step] <= movement_points:
+            movement_points -= int(room.tiles.movement_cost[step])
+            new_position = step
+            step = room.downhill_step(distance_map, new_position)
+        if new_position != self._position:
+            room.move_token(self, new_position)
+            self._actions['movement'] = False
+
+    def valid_movements(self, room) -> dict[tuple[int, int], int]:
+        return room.flood_fill(self._position, self.speed)
+
+    def take_movement_action(self, room, destination: tuple[int, int]) -> tuple[int, int]:
+        if not self._actions['movement']:
+            return self._position
+        movement_points = self.speed
+        new_position = self._position
+        for point in room.find_path(self._position, destination)[1:]:
+            tile = room.tiles[point]
+            if tile.movement_cost > movement_points or len(tile.tokens_list) > 0:
+                break
+            movement_points -= tile.movement_cost
+            new_position = point
+        if new_position != self._position:
+            room.move_token(self, new_position)
+            self._actions['movement'] = False
+        return new_position
 
     def valid_targets(self): pass
 
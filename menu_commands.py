@@ -108,12 +108,13 @@ def confirm_ability_scores(ability_scores: dict[str: int], current_game_state: G
     player_race = current_game_state.data_table['character_creation_race']
 
     player_sheet = CharacterSheet(StatBlock(ability_scores), player_race, 'fighter')
-    player_start = [position for position in current_game_state.rooms[0].tiles.keys()
-                    if current_game_state.rooms[0].tiles[position].icon == 3][0]
+    player_start = current_game_state.rooms[0].tiles.find_icon(3)[0]
     current_game_state.turn_tracker.remove_token(current_game_state.turn_tracker.get_token_key(current_game_state.player))
+    current_game_state.rooms[0].remove_token(current_game_state.player)
     current_game_state.player = CreatureToken(player_name, player_start, player_sheet)
     current_game_state.turn_tracker.add_token(current_game_state.player)
-    current_game_state.renderer.load_tiles(current_game_state.rooms[0].stringify())
+    current_game_state.rooms[0].add_token(current_game_state.player)
+    current_game_state.renderer.load_room(current_game_state.rooms[0])
     current_game_state.renderer.load_entities(current_game_state.turn_tracker.tokens.values())
 
     status = StatusTab((0, 0), (12, 1), current_game_state.console)
@@ -150,10 +151,12 @@ def load_game(current_game_state: GameState) -> None:
         current_game_state.current_room = new_game_state.current_room
         current_game_state.turn_tracker = new_game_state.turn_tracker
         current_game_state.player = new_game_state.player
+        for token in current_game_state.turn_tracker.tokens.values():
+            current_game_state.rooms[current_game_state.current_room].add_token(token)
 
         current_game_state.data_table['races'] = load_races()
 
-        current_game_state.renderer.load_tiles(current_game_state.rooms[0].stringify())
+        current_game_state.renderer.load_room(current_game_state.rooms[0])
         current_game_state.renderer.load_entities(current_game_state.turn_tracker.tokens.values())
 
         status = StatusTab((0, 0), (12, 1), current_game_state.console)
@@ -181,11 +184,9 @@ def launch_map_editor(current_game_state: GameState) -> None: pass
 
 def open_movement_menu(current_game_state: GameState) -> None:
     current_game_state.menus['selection'].curser = current_game_state.player.position
+    current_game_state.menus['selection'].bounds = current_game_state.rooms[current_game_state.current_room].size
     current_game_state.menus['play'].pause()
-    highlighted = current_game_state.rooms[current_game_state.current_room].flood_fill(
-        current_game_state.player.position,
-        current_game_state.player.speed
-    )
+    highlighted = current_game_state.player.valid_movements(current_game_state.rooms[current_game_state.current_room])
     current_game_state.renderer.highlighted_tiles = highlighted
     current_game_state.menus['selection'].activate()
 
@@ -198,14 +199,11 @@ def cancel_selection(current_game_state: GameState) -> None:
 
 
 def confirm_selection(current_game_state: GameState) -> None:
-    movement_range = current_game_state.rooms[current_game_state.current_room].flood_fill(
-        current_game_state.player.position,
-        current_game_state.player.speed
-    )
-    curser = current_game_state.menus['selection'].curser
-    target_position = (curser[0] % current_game_state.renderer.width, curser[1] % current_game_state.renderer.height)
+    current_room = current_game_state.rooms[current_game_state.current_room]
+    movement_range = current_game_state.player.valid_movements(current_room)
+    target_position = current_game_state.menus['selection'].curser
     if target_position in movement_range:
-        current_game_state.player.position = target_position
+        current_room.move_token(current_game_state.player, target_position)
         current_game_state.renderer.highlighted_tiles = None
         current_game_state.renderer.curser = None
         current_game_state.renderer.load_entities(current_game_state.turn_tracker.tokens.values())
@@ -1,17 +1,19 @@
 from __future__ import annotations
+import itertools
 import math
-from abc import abstractmethod
 from typing import Callable
 
 import tcod
-from tcod.context import Context
 
 from color import Color
-from gui_element import GuiElement
+from gui_element import GuiElement, text_region
 from menu_command import MenuCommand
 
 
 class Menu(GuiElement):
+    _activations = itertools.count()
+    _activated_at = -1
+
     def __init__(self):
         self._curser = (0, 0)
         self._position = (0, 0)
@@ -21,7 +23,8 @@ class Menu(GuiElement):
         self._height = 0
         self._activated = False
         self._paused = True
-        self._key_codes = {'ESCAPE': tcod.event.K_ESCAPE}
+        self._key_codes = {'CANCEL': tcod.event.K_ESCAPE}
+        self._bindings: dict[tcod.event_constants, Callable] = {}
 
     @property
     def height(self) -> int:
@@ -70,6 +73,20 @@ class Menu(GuiElement):
     @key_codes.setter
     def key_codes(self, new_key_codes: dict[str, tcod.event_constants]):
         self._key_codes = new_key_codes
+        self._compile_bindings()
+
+    @property
+    def bindings(self) -> dict[tcod.event_constants, Callable]:
+        return self._bindings
+
+    def rebind_key(self, action: str, key: tcod.event_constants):
+        action = action.upper()
+        if action not in self._key_codes.keys():
+            raise ValueError(f'\nNo key code exists for action: {action}')
+        if key != self._key_codes[action] and (key in self._bindings or key in self._key_codes.values()):
+            raise ValueError(f'\nKey {key} is already bound')
+        self._key_codes[action] = key
+        self._compile_bindings()
 
     def add_command(self, *args, name: str, command: Callable, **kwargs):
         self.menu_options[name.upper()] = MenuCommand(
@@ -78,6 +95,25 @@ class Menu(GuiElement):
             positional_args=args,
             keyword_args=kwargs
         )
+        self._compile_bindings()
+
+    def _command(self, name: str, argument: Callable = None) -> Callable | None:
+        menu_command = self.menu_options.get(name.upper())
+        if menu_command is None:
+            return None
+
+        def run_command():
+            arguments = () if argument is None else (argument(),)
+            menu_command.command(*arguments, *menu_command.positional_args, **menu_command.keyword_args)
+        return run_command
+
+    def _actions(self) -> dict[str, Callable]:
+        return {'CANCEL': self._command('cancel')}
+
+    def _compile_bindings(self):
+        actions = self._actions()
+        self._bindings = {key: actions[action] for action, key in self._key_codes.items()
+                          if actions.get(action) is not None}
 
     @property
     def paused(self) -> bool:
@@ -93,8 +129,13 @@ class Menu(GuiElement):
     def activated(self):
         return self._activated
 
+    @property
+    def activated_at(self) -> int:
+        return self._activated_at
+
     def activate(self):
         self._activated = True
+        self._activated_at = next(Menu._activations)
 
     def deactivate(self):
         self._activated = False
@@ -119,8 +160,20 @@ class Menu(GuiElement):
         if self.curser[0] >= self.width:
             self.curser = (0, self.curser[1])
 
-    @abstractmethod
-    def process(self, fps: int, context: Context): pass
+    def render_state(self, *args) -> tuple:
+        return self._activated, self._paused, self._position, self._width, self._height, self._curser, args
+
+    def handle_event(self, event: tcod.event.Event):
+        if self._activated and not self._paused:
+            match event:
+                case tcod.event.Quit():
+                    quit_command = self._command('quit')
+                    if quit_command is not None:
+                        quit_command()
+                case tcod.event.KeyDown():
+                    binding = self._bindings.get(event.sym)
+                    if binding is not None:
+                        binding()
 
 
 class MovementMenu(Menu):
@@ -131,6 +184,8 @@ class MovementMenu(Menu):
         self._height = size[1]
         self.menu_options: dict[str, MenuCommand] = {}
         self._curser = (0, 0)
+        self._bounds = (20, 20)
+        self._text = ''
         self._activated = False
         self._paused = False
         self._console = console
@@ -138,27 +193,38 @@ class MovementMenu(Menu):
             'UP': tcod.event.K_UP,
             'DOWN': tcod.event.K_DOWN,
             'LEFT': tcod.event.K_LEFT,
-            'RIGHT': tcod.event.K_RIGHT
+            'RIGHT': tcod.event.K_RIGHT,
+            'CONFIRM': tcod.event.K_RETURN,
+            'CANCEL': tcod.event.K_ESCAPE
         }
+        self._compile_bindings()
+
+    @property
+    def bounds(self) -> tuple[int, int]:
+        return self._bounds
+
+    @bounds.setter
+    def bounds(self, new_bounds: tuple[int, int]):
+        self._bounds = new_bounds
 
     def curser_up(self):
         self._curser = (self._curser[0], self._curser[1] - 1)
         if self._curser[1] < 0:
-            self._curser = (self._curser[0], 19)
+            self._curser = (self._curser[0], self._bounds[1] - 1)
 
     def curser_down(self):
         self._curser = (self._curser[0], self._curser[1] + 1)
-        if self._curser[1] >= 20:
+        if self._curser[1] >= self._bounds[1]:
             self._curser = (self._curser[0], 0)
 
     def curser_left(self):
         self._curser = (self._curser[0] - 1, self._curser[1])
         if self._curser[0] < 0:
-            self._curser = (19, self._curser[1])
+            self._curser = (self._bounds[0] - 1, self._curser[1])
 
     def curser_right(self):
         self._curser = (self._curser[0] + 1, self._curser[1])
-        if self._curser[0] >= 20:
+        if self._curser[0] >= self._bounds[0]:
             self._curser = (0, self._curser[1])
 
     def _text_wrap(self, text_to_wrap: str) -> str:
@@ -188,42 +254,34 @@ class MovementMenu(Menu):
                 text_to_wrap = f'{text_to_wrap}\n{line_}'
         return text_to_wrap
 
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        return text_region(self._position, self._text, self._width, self._height)
+
+    def render_state(self, text: str = '') -> tuple:
+        return self._activated, self._position, self.description(text)
+
+    def description(self, text: str) -> str:
+        text = f'Tile Description: {text}'
+        if len(text) > self._width:
+            text = self._text_wrap(text)
+        return text
+
     def render(self, text: str):
         if self._activated:
             x, y = self._position
-            text = f'Tile Description: {text}'
-            if len(text) > self._width:
-                text = self._text_wrap(text)
-            self._console.print(x=x, y=y, string=text)
-
-    def process(self, fps: int, context: Context):
-        if self._activated and not self._paused:
-            for event in tcod.event.wait(1.0 / fps):
-                context.convert_event(event)
-                match event:
-                    case tcod.event.Quit():
-                        print(f"KeyDown: {event}")
-                        menu_command = self.menu_options['quit'.upper()]
-                        print(f'MenuCommand{menu_command.name, menu_command.command}')
-                        menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
-                    case tcod.event.KeyDown():
-                        print(f"KeyDown: {event}")
-                        if event.sym == self._key_codes['UP']:
-                            self.curser_up()
-                        elif event.sym == self._key_codes['DOWN']:
-                            self.curser_down()
-                        elif event.sym == self._key_codes['LEFT']:
-                            self.curser_left()
-                        elif event.sym == self._key_codes['RIGHT']:
-                            self.curser_right()
-                        elif event.sym == tcod.event.K_RETURN:
-                            menu_command = self.menu_options['confirm'.upper()]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
-                        elif event.sym == tcod.event.K_ESCAPE:
-                            menu_command = self.menu_options['cancel'.upper()]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
+            self._text = self.description(text)
+            self._console.print(x=x, y=y, string=self._text)
+
+    def _actions(self) -> dict[str, Callable]:
+        return {
+            'UP': self.curser_up,
+            'DOWN': self.curser_down,
+            'LEFT': self.curser_left,
+            'RIGHT': self.curser_right,
+            'CONFIRM': self._command('confirm'),
+            'CANCEL': self._command('cancel')
+        }
 
 
 class ListedMenu(Menu):
@@ -238,10 +296,13 @@ class ListedMenu(Menu):
         self._console = console
         self._key_codes = {
             'UP': tcod.event.K_UP,
-            'DOWN': tcod.event.K_DOWN
+            'DOWN': tcod.event.K_DOWN,
+            'SELECT': tcod.event.K_RETURN,
+            'QUIT': tcod.event.K_ESCAPE
         }
         self._hidden: list[str] = []
         self._overrides: dict[tcod.event_constants, str] = {}
+        self._compile_bindings()
 
     def curser_up(self):
         self._curser = (self._curser[0], self._curser[1] - 1)
@@ -292,12 +353,21 @@ class ListedMenu(Menu):
             self._hidden.append(name.upper())
         while self.curser_key in self._hidden and len(self.menu_options) > len(self._hidden):
             self.curser_up()
+        self._compile_bindings()
+
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        longest = max([len(key) for key in self.menu_options.keys()], default=0)
+        return (*self._position, max(self._width, longest + 3), max(self._height, len(self.menu_options) + 2))
+
+    def render_state(self, *args) -> tuple:
+        return super().render_state(*args) + (tuple(self.menu_options.keys()), tuple(self._hidden))
 
     def render(self):
         if self._activated:
             skipped = 0
             height, width = self._height, self._width
-            color: Color = Color(1.0, 1.0, 1.0)
+            color: Color = Color.intern(1.0, 1.0, 1.0)
             spacer = math.floor((width - 6) / 2)
             self._console.print(
                 x=self._position[0],
@@ -316,9 +386,9 @@ class ListedMenu(Menu):
                     skipped += 1
                 else:
                     if item == self._curser[1] and not self.paused:
-                        color = Color(0.0, 1.0, 0.0)
+                        color = Color.intern(0.0, 1.0, 0.0)
                     else:
-                        color = Color(1.0, 1.0, 1.0)
+                        color = Color.intern(1.0, 1.0, 1.0)
                     x, y = self._position
                     spacer = int((width - 2 - len(menu_item)) / 2)
                     if len(menu_item) % 2 == 1:
@@ -335,7 +405,7 @@ class ListedMenu(Menu):
                             string=f"|{' ' * spacer}{menu_item}{' ' * spacer}|",
                             fg=color.rgb()
                         )
-            color = Color(1.0, 1.0, 1.0)
+            color = Color.intern(1.0, 1.0, 1.0)
             for y in range(self.height - 2 - len(self.menu_options)):
                 spacer = int(width - 2)
                 self._console.print(
@@ -351,38 +421,30 @@ class ListedMenu(Menu):
                 string=f"|{'_' * spacer}|"
             )
 
-    def process(self, fps: int, context: tcod.context.Context):
-        if self._activated and not self._paused:
-            for event in tcod.event.wait(1.0 / fps):
-                context.convert_event(event)
-                match event:
-                    case tcod.event.Quit():
-                        print(f"KeyDown: {event}")
-                        menu_command = self.menu_options['quit'.upper()]
-                        print(f'MenuCommand{menu_command.name, menu_command.command}')
-                        menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
-                    case tcod.event.KeyDown():
-                        print(f"KeyDown: {event}")
-                        if event.sym in self._overrides:
-                            name = self._overrides[event.sym]
-                            menu_command = self.menu_options[name]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
-                        else:
-                            if event.sym == self._key_codes['UP']:
-                                self.curser_up()
-                            elif event.sym == self._key_codes['DOWN']:
-                                self.curser_down()
-                            elif event.sym == tcod.event.K_RETURN:
-                                print(
-                                    self.menu_options[self.curser_key].name,
-                                    self.menu_options[self.curser_key].command
-                                )
-                                self.select()
-                            elif event.sym == tcod.event.K_ESCAPE:
-                                menu_command = self.menu_options['quit'.upper()]
-                                print(f'MenuCommand{menu_command.name, menu_command.command}')
-                                menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
+    def rebind_key(self, action: str, key: tcod.event_constants):
+        name = action.upper()
+        if name not in self._overrides.values():
+            super().rebind_key(name, key)
+            return
+        old_key = next(old_key for old_key, override in self._overrides.items() if override == name)
+        if key != old_key and (key in self._bindings or key in self._key_codes.values()):
+            raise ValueError(f'\nKey {key} is already bound')
+        del self._overrides[old_key]
+        self._overrides[key] = name
+        self._compile_bindings()
+
+    def _actions(self) -> dict[str, Callable]:
+        return {
+            'UP': self.curser_up,
+            'DOWN': self.curser_down,
+            'SELECT': self.select if len(self.menu_options) > 0 else None,
+            'QUIT': self._command('quit')
+        }
+
+    def _compile_bindings(self):
+        super()._compile_bindings()
+        for key, name in self._overrides.items():
+            self._bindings[key] = self._command(name)
 
 
 class TextMenu(Menu):
@@ -425,10 +487,14 @@ class TextMenu(Menu):
         self._console = console
         self._key_codes = {
             'LEFT': tcod.event.K_LEFT,
-            'RIGHT': tcod.event.K_RIGHT
+            'RIGHT': tcod.event.K_RIGHT,
+            'BACKSPACE': tcod.event.K_BACKSPACE,
+            'CONFIRM': tcod.event.K_RETURN,
+            'CANCEL': tcod.event.K_ESCAPE
         }
         self._text = ''
         self._text_field = ''
+        self._compile_bindings()
 
     @property
     def text(self) -> str:
@@ -438,37 +504,33 @@ class TextMenu(Menu):
     def text(self, new_text):
         self._text = new_text
 
-    def process(self, fps: int, context: Context):
-        if self._activated and not self._paused:
-            for event in tcod.event.wait(1.0 / fps):
-                context.convert_event(event)
-                match event:
-                    case tcod.event.Quit():
-                        print(f"KeyDown: {event}")
-                        menu_command = self.menu_options['quit'.upper()]
-                        print(f'MenuCommand{menu_command.name, menu_command.command}')
-                        menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
-                    case tcod.event.KeyDown():
-                        print(f"KeyDown: {event}")
-                        if event.sym == self._key_codes['LEFT']:
-                            self.curser_left()
-                        elif event.sym == self._key_codes['RIGHT']:
-                            self.curser_right()
-                        elif event.sym in self.char_codes.keys():
-                            self._text_field = f'{self._text_field}{self.char_codes[event.sym]}'
-                        elif event.sym == tcod.event.K_BACKSPACE:
-                            new_text_field = ''
-                            for char in range(len(self._text_field)-1):
-                                new_text_field = f'{new_text_field}{self._text_field[char]}'
-                            self._text_field = new_text_field
-                        elif event.sym == tcod.event.K_RETURN:
-                            menu_command = self.menu_options['confirm'.upper()]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(self._text_field, *menu_command.positional_args, **menu_command.keyword_args)
-                        elif event.sym == tcod.event.K_ESCAPE:
-                            menu_command = self.menu_options['cancel'.upper()]
-                            print(f'MenuCommand{menu_command.name, menu_command.command}')
-                            menu_command.command(*menu_command.positional_args, **menu_command.keyword_args)
+    def type_char(self, char: str):
+        self._text_field = f'{self._text_field}{char}'
+
+    def backspace(self):
+        self._text_field = self._text_field[:-1]
+
+    def _actions(self) -> dict[str, Callable]:
+        return {
+            'LEFT': self.curser_left,
+            'RIGHT': self.curser_right,
+            'BACKSPACE': self.backspace,
+            'CONFIRM': self._command('confirm', lambda: self._text_field),
+            'CANCEL': self._command('cancel')
+        }
+
+    def _compile_bindings(self):
+        super()._compile_bindings()
+        for key, char in self.char_codes.items():
+            if key not in self._bindings:
+                self._bindings[key] = lambda char=char: self.type_char(char)
+
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        return text_region(self._position, f'{self._text}\n{self._text_field}', self._width)
+
+    def render_state(self, *args) -> tuple:
+        return super().render_state(*args) + (self._text, self._text_field)
 
     def render(self):
         if self._activated:
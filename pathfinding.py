@@ -0,0 +1,158 @@
+import heapq
+import math
+
+import numpy
+
+from tile_grid import TileGrid
+
+SQRT_2 = math.sqrt(2)
+ORTHOGONAL_STEPS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIAGONAL_STEPS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def manhattan(dx: int, dy: int) -> float:
+    return dx + dy
+
+
+def octile(dx: int, dy: int) -> float:
+    return dx + dy + (SQRT_2 - 2) * min(dx, dy)
+
+
+heuristics = {'manhattan': manhattan, 'octile': octile}
+
+
+class PathFinder:
+    def __init__(self, tiles: TileGrid):
+        self._tiles = tiles
+        self._size: tuple[int, int] = None
+        self._cost: list[float] = []
+        self._came_from: list[int] = []
+        self._seen: list[int] = []
+        self._closed: list[int] = []
+        self._open: list[tuple[float, int]] = []
+        self._search = 0
+        self._revision = -1
+        self._token_revision = -1
+        self._step_costs: list[int] = []
+        self._occupied: set[int] = set()
+        self._min_cost = 1
+
+    def _prepare_buffers(self):
+        if self._size != self._tiles.size:
+            self._size = self._tiles.size
+            length = self._size[0] * self._size[1]
+            self._cost = [0.0] * length
+            self._came_from = [-1] * length
+            self._seen = [0] * length
+            self._closed = [0] * length
+            self._search = 0
+            self._revision = -1
+            self._token_revision = -1
+        if self._revision != self._tiles.revision:
+            self._revision = self._tiles.revision
+            passable = self._tiles.passable
+            self._step_costs = numpy.where(passable, self._tiles.movement_cost, 0).ravel().tolist()
+            if passable.any():
+                self._min_cost = max(int(self._tiles.movement_cost[passable].min()), 1)
+        if self._token_revision != self._tiles.token_revision:
+            self._token_revision = self._tiles.token_revision
+            self._occupied = {x * self._size[1] + y for x, y in self._tiles.tokens.keys()}
+        self._open.clear()
+        self._search += 1
+
+    def find_path(self, start: tuple[int, int], goal: tuple[int, int], *, heuristic: str = None,
+                  diagonal: bool = False, max_cost: float = None) -> list[tuple[int, int]]:
+        if heuristic is None:
+            heuristic = 'octile' if diagonal else 'manhattan'
+        if diagonal and heuristic == 'manhattan':
+            raise ValueError('The manhattan heuristic overestimates diagonal movement, use octile instead')
+        estimate = heuristics[heuristic]
+        if start not in self._tiles or goal not in self._tiles:
+            return []
+
+        self._prepare_buffers()
+        search = self._search
+        width, height = self._size
+        step_costs, occupied = self._step_costs, self._occupied
+        cost, came_from, seen, closed, frontier = self._cost, self._came_from, self._seen, self._closed, self._open
+        steps = ORTHOGONAL_STEPS + DIAGONAL_STEPS if diagonal else ORTHOGONAL_STEPS
+        scale = self._min_cost
+        goal_x, goal_y = goal
+        start_index, goal_index = start[0] * height + start[1], goal_x * height + goal_y
+
+        cost[start_index] = 0.0
+        seen[start_index] = search
+        came_from[start_index] = -1
+        heapq.heappush(frontier, (scale * estimate(abs(goal_x - start[0]), abs(goal_y - start[1])), start_index))
+        while len(frontier) != 0:
+            estimated, index = heapq.heappop(frontier)
+            if closed[index] == search:
+                continue
+            if index == goal_index:
+                return self._reconstruct(goal_index)
+            closed[index] = search
+            x, y = divmod(index, height)
+            index_cost = cost[index]
+            for dx, dy in steps:
+                neighbor_x, neighbor_y = x + dx, y + dy
+                if not (0 <= neighbor_x < width and 0 <= neighbor_y < height):
+                    continue
+                neighbor = neighbor_x * height + neighbor_y
+                step_cost = step_costs[neighbor]
+                if step_cost == 0 or closed[neighbor] == search or (neighbor in occupied and neighbor != goal_index):
+                    continue
+                if dx and dy:
+                    if step_costs[neighbor_x * height + y] == 0 or step_costs[x * height + neighbor_y] == 0:
+                        continue
+                    step_cost *= SQRT_2
+                neighbor_cost = index_cost + step_cost
+                if max_cost is not None and neighbor_cost > max_cost:
+                    continue
+                if seen[neighbor] != search or neighbor_cost < cost[neighbor]:
+                    seen[neighbor] = search
+                    cost[neighbor] = neighbor_cost
+                    came_from[neighbor] = index
+                    remaining = scale * estimate(abs(goal_x - neighbor_x), abs(goal_y - neighbor_y))
+                    heapq.heappush(frontier, (neighbor_cost + remaining, neighbor))
+        return []
+
+    def _reconstruct(self, goal_index: int) -> list[tuple[int, int]]:
+        height = self._size[1]
+        path = []
+        index = goal_index
+        while index != -1:
+            path.append(divmod(index, height))
+            index = self._came_from[index]
+        path.reverse()
+        return path
+
+
+def distance_map(tiles: TileGrid, goals: list[tuple[int, int]], max_cost: int = None) -> numpy.ndarray:
+    width, height = tiles.size
+    step_costs = numpy.where(tiles.passable, tiles.movement_cost, 0).ravel().tolist()
+    distance = [-1] * (width * height)
+    frontier = []
+    for x, y in goals:
+        if (x, y) in tiles:
+            distance[x * height + y] = 0
+            frontier.append((0, x * height + y))
+    heapq.heapify(frontier)
+    while len(frontier) != 0:
+        index_cost, index = heapq.heappop(frontier)
+        if index_cost > distance[index]:
+            continue
+        neighbor_cost = index_cost + max(step_costs[index], 1)
+        if max_cost is not None and neighbor_cost > max_cost:
+            continue
+        x, y = divmod(index, height)
+        for dx, dy in ORTHOGONAL_STEPS:
+            neighbor_x, neighbor_y = x + dx, y + dy
+            if not (0 <= neighbor_x < width and 0 <= neighbor_y < height):
+                continue
+            neighbor = neighbor_x * height + neighbor_y
+            if step_costs[neighbor] == 0:
+                continue
+            if distance[neighbor] == -1 or neighbor_cost < distance[neighbor]:
+                distance[neighbor] = neighbor_cost
+                heapq.heappush(frontier, (neighbor_cost, neighbor))
+    return numpy.array(distance, dtype=numpy.int32).reshape(width, height)
@@ -0,0 +1,100 @@
+import numpy
+
+
+class RenderLayer:
+    def __init__(self, size: tuple[int, int], glyphs: bool = True):
+        self._has_glyphs = glyphs
+        self.resize(size)
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.mask.shape
+
+    @property
+    def has_glyphs(self) -> bool:
+        return self._has_glyphs
+
+    def resize(self, size: tuple[int, int]):
+        self.mask = numpy.zeros(size, dtype=bool)
+        self.glyphs = numpy.zeros(size, dtype=numpy.int32)
+        self.foreground = numpy.zeros((*size, 3), dtype=numpy.uint8)
+        self.background = numpy.zeros((*size, 3), dtype=numpy.uint8)
+        self.dirty = numpy.ones(size, dtype=bool)
+
+    def clear(self):
+        self.dirty |= self.mask
+        self.mask[...] = False
+
+    def erase(self, xs: numpy.ndarray, ys: numpy.ndarray):
+        self.dirty[xs, ys] |= self.mask[xs, ys]
+        self.mask[xs, ys] = False
+
+    def paint(self, xs: numpy.ndarray, ys: numpy.ndarray, glyphs: numpy.ndarray or None,
+              foreground: numpy.ndarray, background: numpy.ndarray):
+        changed = ~self.mask[xs, ys]
+        changed |= (self.foreground[xs, ys] != foreground).any(axis=-1)
+        changed |= (self.background[xs, ys] != background).any(axis=-1)
+        if glyphs is not None:
+            changed |= self.glyphs[xs, ys] != glyphs
+            self.glyphs[xs, ys] = glyphs
+        self.foreground[xs, ys] = foreground
+        self.background[xs, ys] = background
+        self.mask[xs, ys] = True
+        self.dirty[xs[changed], ys[changed]] = True
+
+    def replace(self, xs: numpy.ndarray, ys: numpy.ndarray, glyphs: numpy.ndarray or None,
+                foreground: numpy.ndarray, background: numpy.ndarray):
+        kept = numpy.zeros(self.size, dtype=bool)
+        kept[xs, ys] = True
+        removed = self.mask & ~kept
+        self.dirty |= removed
+        self.mask[removed] = False
+        self.paint(xs, ys, glyphs, foreground, background)
+
+
+class Compositor:
+    def __init__(self, size: tuple[int, int], layers: list[RenderLayer]):
+        self._layers = layers
+        self.resize(size)
+
+    @property
+    def layers(self) -> list[RenderLayer]:
+        return self._layers
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.covered.shape
+
+    def resize(self, size: tuple[int, int]):
+        for layer in self._layers:
+            layer.resize(size)
+        self.covered = numpy.zeros(size, dtype=bool)
+        self.glyphs = numpy.zeros(size, dtype=numpy.int32)
+        self.foreground = numpy.zeros((*size, 3), dtype=numpy.uint8)
+        self.background = numpy.zeros((*size, 3), dtype=numpy.uint8)
+
+    def compose(self) -> numpy.ndarray:
+        dirty = numpy.zeros(self.size, dtype=bool)
+        for layer in self._layers:
+            dirty |= layer.dirty
+        xs, ys = numpy.nonzero(dirty)
+        if len(xs) == 0:
+            return dirty
+        covered = numpy.zeros(len(xs), dtype=bool)
+        glyphs = numpy.zeros(len(xs), dtype=numpy.int32)
+        foreground = numpy.zeros((len(xs), 3), dtype=numpy.uint8)
+        background = numpy.zeros((len(xs), 3), dtype=numpy.uint8)
+        for layer in self._layers:
+            painted = layer.mask[xs, ys]
+            layer_xs, layer_ys = xs[painted], ys[painted]
+            if layer.has_glyphs:
+                glyphs[painted] = layer.glyphs[layer_xs, layer_ys]
+            foreground[painted] = layer.foreground[layer_xs, layer_ys]
+            background[painted] = layer.background[layer_xs, layer_ys]
+            covered |= painted
+            layer.dirty[...] = False
+        self.covered[xs, ys] = covered
+        self.glyphs[xs, ys] = glyphs
+        self.foreground[xs, ys] = foreground
+        self.background[xs, ys] = background
+        return dirty
@@ -1,45 +1,54 @@
+from collections import OrderedDict
+from functools import lru_cache
+import heapq
+import math
+
+import numpy
+
 from tile import Tile
+from map_token import CreatureToken
+from field_of_view import FieldOfView
+from pathfinding import PathFinder, distance_map
+from spatial_index import SpatialIndex
+from tile_grid import TileGrid, UNDEFINED
+
 
+@lru_cache(maxsize=None)
+def square_stencil(radius: int) -> numpy.ndarray:
+    span = numpy.arange(-radius + 1, radius, dtype=numpy.int32)
+    x, y = numpy.meshgrid(span, span, indexing='ij')
+    stencil = numpy.stack((x.ravel(), y.ravel()), axis=1)
+    stencil.flags.writeable = False
+    return stencil
 
-def find_tiles_in_square(radius: int, offset: tuple[int, int] = None) -> list[tuple[int, int]]:
-    if offset is None:
-        offset = (0, 0)
-    x_center, y_center = offset
-    points = set()
-    result = []
 
-    for x in range(radius):
-        for y in range(radius):
-            x_sym = - x
-            y_sym = - y
-            points.add((x+x_center, y+y_center))
-            points.add((x+x_center, y_sym+y_center))
-            points.add((x_sym+x_center, y+y_center))
-            points.add((x_sym+x_center, y_sym+y_center))
-    result += list(points)
+@lru_cache(maxsize=None)
+def circle_stencil(radius: int) -> numpy.ndarray:
+    span = numpy.arange(-radius, radius + 1, dtype=numpy.int32)
+    x, y = numpy.meshgrid(span, span, indexing='ij')
+    inside = x ** 2 + y ** 2 <= radius ** 2
+    stencil = numpy.stack((x[inside], y[inside]), axis=1)
+    stencil.flags.writeable = False
+    return stencil
 
-    return result
 
+def translate_stencil(stencil: numpy.ndarray, offset: tuple[int, int] = None,
+                      bounds: tuple[int, int] = None) -> numpy.ndarray:
+    points = stencil if offset is None else stencil + numpy.array(offset, dtype=numpy.int32)
+    if bounds is not None:
+        inside = (points[:, 0] >= 0) & (points[:, 0] < bounds[0]) & (points[:, 1] >= 0) & (points[:, 1] < bounds[1])
+        points = points[inside]
+    return points
 
-def find_tiles_in_circle(radius: int, offset: tuple[int, int] = None) -> list[tuple[int, int]]:
-    if offset is None:
-        offset = (0, 0)
-    x_center, y_center = offset
-    points = set()
-    result = []
 
-    for x in range(radius + 1):
-        for y in range(radius + 1):
-            if x ** 2 + y ** 2 <= radius ** 2:
-                x_sym = - x
-                y_sym = - y
-                points.add((x+x_center, y+y_center))
-                points.add((x+x_center, y_sym+y_center))
-                points.add((x_sym+x_center, y+y_center))
-                points.add((x_sym+x_center, y_sym+y_center))
-    result += list(points)
+def find_tiles_in_square(radius: int, offset: tuple[int, int] = None,
+                         bounds: tuple[int, int] = None) -> list[tuple[int, int]]:
+    return [(x, y) for x, y in translate_stencil(square_stencil(radius), offset, bounds).tolist()]
 
-    return result
+
+def find_tiles_in_circle(radius: int, offset: tuple[int, int] = None,
+                         bounds: tuple[int, int] = None) -> list[tuple[int, int]]:
+    return [(x, y) for x, y in translate_stencil(circle_stencil(radius), offset, bounds).tolist()]
 
 
 def transfer_token(token_name: str, origin: Tile, destination: Tile):
@@ -52,76 +61,245 @@ def get_neighbors(point: tuple[int, int]) -> tuple[tuple[int, int], list[tuple[i
     return point, [(point[0]+1, point[1]), (point[0], point[1]+1), (point[0]-1, point[1]), (point[0], point[1]-1)]
 
 
+class ReachabilityCache:
+    def __init__(self, capacity: int = 256):
+        self._capacity = capacity
+        self._entries: OrderedDict[tuple[tuple[int, int], int, int | tuple[int, int]], dict[tuple[int, int], int]] = \
+            OrderedDict()
+
+    def get(self, start: tuple[int, int], movement_points: int, revision: int | tuple[int, int]) \
+            -> dict[tuple[int, int], int] or None:
+        key = (start, movement_points, revision)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        return None
+
+    def put(self, start: tuple[int, int], movement_points: int, revision: int | tuple[int, int],
+            fill: dict[tuple[int, int], int]):
+        self._entries[(start, movement_points, revision)] = fill
+        self._entries.move_to_end((start, movement_points, revision))
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class Room:
     def __init__(self, seed: int, size: tuple[int, int], tile_set: dict[str, dict[str, any]],
-                 tile_map: dict[tuple[int, int], Tile] = None):
+                 tile_map: TileGrid = None):
         if tile_map is None:
-            self._tiles = {}
-            for x in range(size[0]):
-                for y in range(size[1]):
-                    self._tiles[(x, y)] = Tile((x, y), {})
+            self._tiles = TileGrid(size)
+            self._tiles.fill(numpy.full(size, self._tiles.add_type({}), dtype=numpy.int16))
         else:
             self._tiles = tile_map
         self._seed = seed
         self._size = size
         self._tile_set = tile_set
-        self._tile_set_icons: list[int, str] = {}
-        for index, icon in enumerate(tile_set.keys()):
+        self._reachability = ReachabilityCache()
+        self._path_finder = PathFinder(self._tiles)
+        self._visibility = ReachabilityCache()
+        self._field_of_view = FieldOfView(self._tiles)
+        self._tile_set_icons: dict[int, str] = {}
+        for index, icon in enumerate(tile_set):
             self._tile_set_icons[index - 1] = icon
 
     @classmethod
     def new(cls, seed: int, tile_set: dict[str, dict[str, any]], tile_map: list[list[str]]):
         length_y, length_x = len(tile_map), max([len(column) for column in tile_map])
         size = (length_x, length_y)
-        tiles = {}
-        for y in range(len(tile_map)):
-            for x in range(len(tile_map[0])):
-                tiles[(x, y)] = Tile((x, y), tile_set[tile_map[y][x]])
+        tiles = TileGrid(size)
+        type_lookup = {}
+        for icon in tile_set.keys():
+            type_lookup[icon] = tiles.add_type(tile_set[icon])
+        type_index = numpy.full(size, -1, dtype=numpy.int16)
+        if all(len(column) == length_x for column in tile_map):
+            icons, inverse = numpy.unique(numpy.array(tile_map), return_inverse=True)
+            lookup = numpy.array([type_lookup[icon] for icon in icons], dtype=numpy.int16)
+            type_index[...] = lookup[inverse].reshape(length_y, length_x).T
+        else:
+            for y, column in enumerate(tile_map):
+                type_index[:len(column), y] = [type_lookup[icon] for icon in column]
+        tiles.fill(type_index)
         new_room = Room(seed, size, tile_set, tiles)
         return new_room
 
+    def char_grid(self, origin: tuple[int, int] = (0, 0), size: tuple[int, int] = None) -> numpy.ndarray:
+        if size is None:
+            size = self._size
+        x_start, y_start = max(origin[0], 0), max(origin[1], 0)
+        x_end = max(min(origin[0] + size[0], self._size[0]), x_start)
+        y_end = max(min(origin[1] + size[1], self._size[1]), y_start)
+        icons = self._tiles.icon[x_start:x_end, y_start:y_end]
+        defined = self._tiles.type_index[x_start:x_end, y_start:y_end] != UNDEFINED
+        width = max(len(icon) for icon in self._tile_set_icons.values())
+        chars = numpy.full(icons.shape, self._tile_set_icons[-1], dtype=f'<U{width}')
+        for icon, char in self._tile_set_icons.items():
+            chars[defined & (icons == icon)] = char
+        return chars
+
+    def tile_map(self) -> list[list[str]]:
+        return self.char_grid().T.tolist()
+
     def stringify(self) -> str:
-        string = ''
-        for y in range(self._size[1]):
-            for x in range(self._size[0]):
-                if (x, y) in self._tiles and self._tiles[(x, y)].icon in self._tile_set_icons:
-                    tile_icon = self._tile_set_icons[self._tiles[(x, y)].icon]
-                else:
-                    tile_icon = self._tile_set_icons[-1]
-                string = f'{string}{tile_icon}'
-            string = f'{string}\n'
-        return string
+        return ''.join(f"{''.join(row)}\n" for row in self.tile_map())
+
+    def tile_char(self, position: tuple[int, int]) -> str:
+        if position in self._tiles and int(self._tiles.icon[position]) in self._tile_set_icons:
+            return self._tile_set_icons[int(self._tiles.icon[position])]
+        return self._tile_set_icons[-1]
+
+    def changes_since(self, revision: int) -> set[tuple[int, int]] or None:
+        return self._tiles.changes_since(revision)
 
     def add_tile(self, position: tuple[int, int], tile_type: dict[str, any] = None):
-        self._tiles[position] = Tile(position, tile_type)
+        if tile_type is None:
+            tile_type = {}
+        self._tiles.set_tile(position, tile_type)
 
     @property
-    def tiles(self):
+    def tiles(self) -> TileGrid:
         return self._tiles
 
-    def flood_fill(self, start: tuple[int, int], movement_points: int) -> list[tuple[int, int]]:
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    @property
+    def revision(self) -> int:
+        return self._tiles.revision
+
+    @property
+    def token_revision(self) -> int:
+        return self._tiles.token_revision
+
+    @property
+    def reachability(self) -> ReachabilityCache:
+        return self._reachability
+
+    def add_token(self, new_token: CreatureToken):
+        self._tiles.add_token(new_token.position, new_token)
+
+    def remove_token(self, token: CreatureToken):
+        if token.name in self._tiles.tokens_at(token.position):
+            self._tiles.remove_token(token.position, token.name)
+
+    def move_token(self, token: CreatureToken, new_position: tuple[int, int]):
+        if token.name in self._tiles.tokens_at(token.position):
+            self._tiles.remove_token(token.position, token.name)
+            token.position = new_position
+            self._tiles.add_token(new_position, token)
+        else:
+            token.position = new_position
+
+    def flood_fill(self, start: tuple[int, int], movement_points: int) -> dict[tuple[int, int], int]:
+        revision = (self.revision, self.token_revision)
+        fill = self._reachability.get(start, movement_points, revision)
+        if fill is not None:
+            return fill
         fill = {}
-        neighbors = {}
         if start in self._tiles:
+            passable = self._tiles.passable
+            movement_cost = self._tiles.movement_cost
             fill[start] = movement_points
-            point, adjacent = get_neighbors(start)
-            neighbors[point] = adjacent
-            while len(neighbors) != 0:
-                points = []
-                for point in neighbors.keys():
-                    points.append(point)
-                for point in points:
-                    adjacent = neighbors.pop(point)
-                    for neighbor in adjacent:
-                        if neighbor in self._tiles and self._tiles[neighbor].passable is True and\
-                                fill[point] - self._tiles[neighbor].movement_cost >= 0:
-                            fill[neighbor] = fill[point] - self._tiles[neighbor].movement_cost
-                            new_point, adjacent = get_neighbors(neighbor)
-                            neighbors[new_point] = adjacent
+            frontier = [(0, start)]
+            while len(frontier) != 0:
+                spent, point = heapq.heappop(frontier)
+                remaining = movement_points - spent
+                if remaining < fill[point]:
+                    continue
+                point, adjacent = get_neighbors(point)
+                for neighbor in adjacent:
+                    if self._tiles.in_bounds(neighbor) and passable[neighbor] and \
+                            not self._tiles.occupied(neighbor):
+                        neighbor_remaining = remaining - int(movement_cost[neighbor])
+                        if neighbor_remaining >= 0 and fill.get(neighbor, -1) < neighbor_remaining:
+                            fill[neighbor] = neighbor_remaining
+                            heapq.heappush(frontier, (movement_points - neighbor_remaining, neighbor))
+        self._reachability.put(start, movement_points, revision, fill)
         return fill
 
-    def get_tokens_in_range(self):
-        pass
+    def flood_fill_array(self, start: tuple[int, int], movement_points: int) -> numpy.ndarray:
+        fill = numpy.full(self._size, -1, dtype=numpy.int32)
+        if start not in self._tiles:
+            return fill
+        x_min, y_min = max(start[0] - movement_points, 0), max(start[1] - movement_points, 0)
+        x_max = min(start[0] + movement_points + 1, self._size[0])
+        y_max = min(start[1] + movement_points + 1, self._size[1])
+        passable = self._tiles.passable[x_min:x_max, y_min:y_max].copy()
+        for x, y in self._tiles.tokens.keys():
+            if x_min <= x < x_max and y_min <= y < y_max:
+                passable[x - x_min, y - y_min] = False
+        movement_cost = self._tiles.movement_cost[x_min:x_max, y_min:y_max].astype(numpy.int32)
+        window = fill[x_min:x_max, y_min:y_max]
+        window[start[0] - x_min, start[1] - y_min] = movement_points
+        reached = numpy.empty_like(window)
+        while True:
+            reached.fill(-1)
+            reached[1:, :] = numpy.maximum(reached[1:, :], window[:-1, :])
+            reached[:-1, :] = numpy.maximum(reached[:-1, :], window[1:, :])
+            reached[:, 1:] = numpy.maximum(reached[:, 1:], window[:, :-1])
+            reached[:, :-1] = numpy.maximum(reached[:, :-1], window[:, 1:])
+            reached -= movement_cost
+            improved = passable & (reached >= 0) & (reached > window)
+            if not improved.any():
+                return fill
+            window[improved] = reached[improved]
+
+    def find_path(self, start: tuple[int, int], goal: tuple[int, int], *, heuristic: str = None,
+                  diagonal: bool = False) -> list[tuple[int, int]]:
+        return self._path_finder.find_path(start, goal, heuristic=heuristic, diagonal=diagonal)
+
+    def visible_tiles(self, origin: tuple[int, int], radius: int) -> frozenset[tuple[int, int]]:
+        visible = self._visibility.get(origin, radius, self.revision)
+        if visible is None:
+            visible = self._field_of_view.visible_tiles(origin, radius)
+            self._visibility.put(origin, radius, self.revision, visible)
+        return visible
+
+    def visible_tokens(self, origin: tuple[int, int], radius: int) -> list[CreatureToken]:
+        visible = self.visible_tiles(origin, radius)
+        return [token for token in self.get_tokens_in_range(origin, radius) if token.position in visible]
+
+    def line_of_sight(self, origin: tuple[int, int], target: tuple[int, int]) -> bool:
+        radius = math.ceil(math.hypot(target[0] - origin[0], target[1] - origin[1]))
+        return target in self.visible_tiles(origin, radius)
+
+    def stairs(self) -> list[tuple[int, int]]:
+        return self._tiles.find_icon(3) + self._tiles.find_icon(4)
+
+    def distance_map(self, goals: list[tuple[int, int]] = None, max_cost: int = None) -> numpy.ndarray:
+        if goals is None:
+            goals = self.stairs()
+        return distance_map(self._tiles, goals, max_cost)
+
+    def downhill_step(self, distances: numpy.ndarray, position: tuple[int, int]) -> tuple[int, int]:
+        best, best_distance = None, distances[position]
+        point, adjacent = get_neighbors(position)
+        for neighbor in adjacent:
+            if self._tiles.in_bounds(neighbor) and not self._tiles.occupied(neighbor):
+                neighbor_distance = distances[neighbor]
+                if 0 <= neighbor_distance and (best_distance < 0 or neighbor_distance < best_distance):
+                    best, best_distance = neighbor, neighbor_distance
+        return best
+
+    @property
+    def token_index(self) -> SpatialIndex:
+        return self._tiles.token_index
+
+    def get_tokens_in_range(self, position: tuple[int, int], radius: int) -> list[CreatureToken]:
+        return self._tiles.token_index.in_radius(position, radius)
+
+    def get_tokens_in_rect(self, corner: tuple[int, int], opposite: tuple[int, int]) -> list[CreatureToken]:
+        return self._tiles.token_index.in_rect(corner, opposite)
+
+    def get_nearest_tokens(self, position: tuple[int, int], count: int = 1,
+                           max_radius: int = None) -> list[CreatureToken]:
+        return self._tiles.token_index.nearest(position, count, max_radius)
 
     @property
     def seed(self):
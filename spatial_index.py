@@ -0,0 +1,94 @@
+from map_token import CreatureToken
+
+
+class SpatialIndex:
+    def __init__(self, bucket_size: int = 8):
+        if bucket_size < 1:
+            raise ValueError(f'\nBucket size is below the minimum of 1: {bucket_size}')
+        self._bucket_size = bucket_size
+        self._buckets: dict[tuple[int, int], dict[CreatureToken, tuple[int, int]]] = {}
+        self._positions: dict[CreatureToken, tuple[int, int]] = {}
+
+    @property
+    def bucket_size(self) -> int:
+        return self._bucket_size
+
+    def bucket(self, position: tuple[int, int]) -> tuple[int, int]:
+        return position[0] // self._bucket_size, position[1] // self._bucket_size
+
+    def position(self, token: CreatureToken) -> tuple[int, int]:
+        return self._positions[token]
+
+    def add(self, token: CreatureToken, position: tuple[int, int]):
+        if token in self._positions:
+            self.remove(token)
+        self._positions[token] = position
+        self._buckets.setdefault(self.bucket(position), {})[token] = position
+
+    def remove(self, token: CreatureToken):
+        position = self._positions.pop(token, None)
+        if position is None:
+            return
+        key = self.bucket(position)
+        bucket = self._buckets[key]
+        del bucket[token]
+        if len(bucket) == 0:
+            del self._buckets[key]
+
+    def move(self, token: CreatureToken, new_position: tuple[int, int]):
+        self.add(token, new_position)
+
+    def in_rect(self, corner: tuple[int, int], opposite: tuple[int, int]) -> list[CreatureToken]:
+        x_min, x_max = min(corner[0], opposite[0]), max(corner[0], opposite[0])
+        y_min, y_max = min(corner[1], opposite[1]), max(corner[1], opposite[1])
+        bucket_min, bucket_max = self.bucket((x_min, y_min)), self.bucket((x_max, y_max))
+        if (bucket_max[0] - bucket_min[0] + 1) * (bucket_max[1] - bucket_min[1] + 1) > len(self._buckets):
+            keys = [key for key in self._buckets.keys()
+                    if bucket_min[0] <= key[0] <= bucket_max[0] and bucket_min[1] <= key[1] <= bucket_max[1]]
+        else:
+            keys = [(x, y) for x in range(bucket_min[0], bucket_max[0] + 1)
+                    for y in range(bucket_min[1], bucket_max[1] + 1) if (x, y) in self._buckets]
+        return [token for key in keys for token, (x, y) in self._buckets[key].items()
+                if x_min <= x <= x_max and y_min <= y <= y_max]
+
+    def in_radius(self, center: tuple[int, int], radius: int) -> list[CreatureToken]:
+        x_center, y_center = center
+        candidates = self.in_rect((x_center - radius, y_center - radius), (x_center + radius, y_center + radius))
+        return [token for token in candidates
+                if (self._positions[token][0] - x_center) ** 2 + (self._positions[token][1] - y_center) ** 2
+                <= radius ** 2]
+
+    def nearest(self, center: tuple[int, int], count: int = 1, max_radius: int = None) -> list[CreatureToken]:
+        x_center, y_center = center
+        bucket_x, bucket_y = self.bucket(center)
+        found: list[tuple[int, CreatureToken]] = []
+        seen = 0
+        ring = 0
+        while seen < len(self._positions):
+            if ring == 0:
+                keys = [(bucket_x, bucket_y)]
+            else:
+                keys = [(bucket_x + dx, bucket_y + dy) for dx in range(-ring, ring + 1)
+                        for dy in (-ring, ring)]
+                keys += [(bucket_x + dx, bucket_y + dy) for dx in (-ring, ring)
+                         for dy in range(-ring + 1, ring)]
+            for key in keys:
+                for token, (x, y) in self._buckets.get(key, {}).items():
+                    found.append(((x - x_center) ** 2 + (y - y_center) ** 2, token))
+                    seen += 1
+            reach = ring * self._bucket_size
+            if max_radius is not None and reach >= max_radius:
+                break
+            if len(found) >= count and sorted(distance for distance, token in found)[count - 1] <= reach ** 2:
+                break
+            ring += 1
+        found.sort(key=lambda entry: entry[0])
+        if max_radius is not None:
+            found = [entry for entry in found if entry[0] <= max_radius ** 2]
+        return [token for distance, token in found[:count]]
+
+    def __contains__(self, token: CreatureToken) -> bool:
+        return token in self._positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
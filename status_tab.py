@@ -2,7 +2,7 @@ import math
 
 import tcod
 
-from gui_element import GuiElement
+from gui_element import GuiElement, text_region
 from map_token import CreatureToken
 
 
@@ -16,6 +16,7 @@ class StatusTab(GuiElement):
         self._position = position
         self._console = console
         self._token = None
+        self._text = ''
 
     @property
     def activated(self) -> bool:
@@ -75,16 +76,26 @@ class StatusTab(GuiElement):
 
     @canvas.setter
     def canvas(self, new_console: tcod.Console):
-        return self._console
+        self._console = new_console
 
-    def render(self):
+    @property
+    def region(self) -> tuple[int, int, int, int]:
+        return text_region(self._position, self._text, self._width)
+
+    def render_state(self, *args) -> tuple:
+        return self._activated, self._position, self.text()
+
+    def text(self) -> str:
         text_to_print = ''
 
         text_to_print = f"{text_to_print}\n{self.center_text(f'{self.token.name}')}"
         text_to_print = f'{text_to_print}\n{self.render_health_bar()}'
+        return text_to_print
 
+    def render(self):
         x, y = self._position
-        self._console.print(x=x, y=y, string=text_to_print)
+        self._text = self.text()
+        self._console.print(x=x, y=y, string=self._text)
 
     def render_health_bar(self) -> str:
         max_hp = self._token.sheet.max_hp
@@ -0,0 +1,52 @@
+from collections import deque
+
+from tcod import Console
+
+from map_renderer import console_grid
+
+
+class SwapChain:
+    def __init__(self, console: Console, buffers: int = 3):
+        if buffers < 3:
+            raise ValueError(f'\nBuffer count is below the minimum of 3: {buffers}')
+        consoles = [Console(console.width, console.height, order='F') for buffer in range(buffers)]
+        for buffer in consoles:
+            buffer.rgb[...] = console_grid(console)
+        self._front = consoles[0]
+        self._latest = consoles[0]
+        self._ready: deque[Console] = deque()
+        self._free: deque[Console] = deque(consoles[1:])
+        self._frames = 0
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    def acquire(self) -> Console:
+        try:
+            back = self._free.popleft()
+        except IndexError:
+            try:
+                back = self._ready.popleft()
+            except IndexError:
+                back = Console(self._front.width, self._front.height, order='F')
+        back.rgb[...] = self._latest.rgb
+        return back
+
+    def publish(self, back: Console):
+        try:
+            self._free.append(self._ready.popleft())
+        except IndexError:
+            pass
+        self._latest = back
+        self._frames += 1
+        self._ready.append(back)
+
+    def front(self) -> Console:
+        try:
+            newest = self._ready.popleft()
+        except IndexError:
+            return self._front
+        self._free.append(self._front)
+        self._front = newest
+        return newest
@@ -3,6 +3,7 @@ import math
 from character_sheet import CharacterSheet, ResistanceLevel
 from character_sheet.stat_block import AbilityScore, ability_score_iterator, StatBlock
 from character_sheet.equipment import Weapon, EquipmentSlot, Armor
+from die import DiceStream
 
 
 def test_base_armor_class():
@@ -204,4 +205,56 @@ def test_resistance():
     assert damage_type is 'slashing'
     assert rouge.hp == rouge.max_hp - damage
 
+
+def test_expected_attack():
+    scores = {}
+    race_modifiers = {}
+    for score in ability_score_iterator():
+        scores[score] = 10
+        race_modifiers[score] = 0
+    race_modifiers[AbilityScore.STR] += 4
+    race = {'ability_mod': race_modifiers}
+    fighter = CharacterSheet(StatBlock(scores), race, 'fighter')
+    sword = Weapon('Iron Sword', EquipmentSlot.hand_r, ('1d8+1', 'slashing'), False)
+
+    fighter.equip(sword)
+    damage, damage_type = fighter.expected_damage(EquipmentSlot.hand_r)
+
+    assert math.isclose(fighter.hit_chance(12, EquipmentSlot.hand_r), 11 / 20)
+    assert math.isclose(damage, 4.5 + 3)
+    assert damage_type == 'slashing'
+
+
+def test_weapon_shares_compiled_dice():
+    scores = {}
+    race_modifiers = {}
+    for score in ability_score_iterator():
+        scores[score] = 10
+        race_modifiers[score] = 0
+    race = {'ability_mod': race_modifiers}
+    fighter = CharacterSheet(StatBlock(scores), race, 'fighter')
+    axe = Weapon('Iron Axe', EquipmentSlot.hand_r, ('1d12-1', 'slashing'), True)
+
+    fighter.equip(axe)
+
+    assert axe.die_type == '1d12'
+    assert axe.modifier == -1
+    assert fighter.dice[axe.die_type].expression is axe.expression.dice
+
+
+def test_sheet_dice_share_stream():
+    scores = {}
+    race_modifiers = {}
+    for score in ability_score_iterator():
+        scores[score] = 10
+        race_modifiers[score] = 0
+    race = {'ability_mod': race_modifiers, 'natural_weapon': ('1d6', 'slashing')}
+    fighter = CharacterSheet(StatBlock(scores), race, 'fighter', DiceStream(1234))
+    rouge = CharacterSheet(StatBlock(scores), race, 'rouge', DiceStream(1234))
+
+    assert fighter.dice['1d20'].stream is fighter.dice['1d6'].stream
+    for roll in range(100):
+        assert fighter.roll_damage() == rouge.roll_damage()
+        assert fighter.roll_initiative() == rouge.roll_initiative()
+
 # robert martin: clean code
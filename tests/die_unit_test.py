@@ -1,5 +1,8 @@
+import math
+
 from die import Advantage
-from die import Dice
+from die import Dice, DiceRegistry, DiceStream
+from die.expression import compile_expression
 
 
 def main():
@@ -44,7 +47,7 @@ def test_verbose_roll_in_range():
     for roll in range(1000):
         result_roll, result_str = new_die.roll(verbose=True)
         assert 1 <= result_roll <= new_die.size
-        assert result_str == f'Total:{result_roll}, Rolls:({result_roll})'
+        assert str(result_str) == f'Total:{result_roll}, Rolls:({result_roll})'
 
 
 def test_roll_reproduction():
@@ -81,5 +84,146 @@ def test_modified_roll():
         assert die_1.roll(modifier=1) == die_2.roll(modifier=1)
 
 
+def test_batch_roll_in_range():
+    new_die = Dice('8d6')
+    results = new_die.roll_batch(1000)
+    assert results.shape == (1000,)
+    assert results.min() >= new_die.number
+    assert results.max() <= new_die.number * new_die.size
+
+
+def test_batch_roll_reproduction():
+    die_1 = Dice('1d20', 1234)
+    die_2 = Dice('1d20', 1234)
+    assert (die_1.roll_batch(1000) == die_2.roll_batch(1000)).all()
+
+
+def test_batch_advantageous_roll():
+    die_1 = Dice('2d10', 5678)
+    die_2 = Dice('2d10', 5678)
+    adv_rolls = die_1.roll_batch(1000, advantage=Advantage.adv)
+    faces = die_2.batch_gen.integers(1, die_2.size + 1, size=(2, 1000, die_2.number))
+    assert (adv_rolls == faces.sum(axis=2).max(axis=0)).all()
+
+
+def test_batch_modified_roll():
+    die_1 = Dice('1d20', 3456)
+    die_2 = Dice('1d20', 3456)
+    assert (die_1.roll_batch(1000, advantage=Advantage.dis, modifier=2) ==
+            die_2.roll_batch(1000, advantage=Advantage.dis) + 2).all()
+
+
+def test_distribution_mean_and_variance():
+    distribution = Dice('2d6').distribution()
+    assert math.isclose(distribution.mean, 7.0)
+    assert math.isclose(distribution.variance, 35 / 6)
+    assert math.isclose(distribution.probability(7), 6 / 36)
+    assert math.isclose(distribution.probability_at_least(10), 6 / 36)
+
+
+def test_advantageous_distribution():
+    advantage = Dice('1d20').distribution(advantage=Advantage.adv, modifier=3)
+    disadvantage = Dice('1d20').distribution(advantage=Advantage.dis)
+    assert math.isclose(advantage.mean, 13.825 + 3)
+    assert math.isclose(disadvantage.mean, 21 - 13.825)
+    assert math.isclose(advantage.probability_at_least(23), 1 - (19 / 20) ** 2)
+    assert math.isclose(advantage.cdf[-1], 1.0)
+
+
+def test_compiled_expression_is_cached():
+    expression = compile_expression('2d6+1d4+3')
+    assert compile_expression('2d6 + 1d4 + 3') is expression
+    assert expression.die_type == '2d6+1d4'
+    assert expression.constant == 3
+    assert expression.dice is compile_expression('2d6+1d4')
+
+
+def test_expression_roll_in_range():
+    new_die = Dice('4d6kh3+1d4-1')
+    for roll in range(1000):
+        result_roll, result_str = new_die.roll()
+        assert 3 <= result_roll <= 21
+
+
+def test_expression_distribution():
+    keep_highest = compile_expression('4d6kh3').distribution()
+    reroll = compile_expression('1d6r1').distribution()
+    assert math.isclose(keep_highest.mean, 15869 / 1296)
+    assert math.isclose(keep_highest.probability(18), 21 / 1296)
+    assert math.isclose(reroll.probability(1), 1 / 36)
+    assert math.isclose(reroll.probability(6), 7 / 36)
+
+
+def test_exploding_roll():
+    new_die = Dice('1d2!', 1234)
+    results = [new_die.roll()[0] for roll in range(1000)]
+    assert 2 not in results
+    assert all(result % 2 == 1 for result in results)
+
+
+def test_invalid_expression():
+    assert not Dice('4d6kh5').is_valid()
+    assert not Dice('1d6+x').is_valid()
+
+
+def test_stream_reproduction():
+    stream_1 = DiceStream(1234)
+    stream_2 = DiceStream(1234)
+    die_1 = Dice('1d20', stream=stream_1)
+    die_2 = Dice('1d20', stream=stream_2)
+    for roll in range(1000):
+        result_roll, result_str = die_1.roll()
+        assert 1 <= result_roll <= die_1.size
+        assert result_roll == die_2.roll()[0]
+
+
+def test_stream_restore():
+    stream = DiceStream(5678)
+    die = Dice('2d6', stream=stream)
+    for roll in range(10):
+        die.roll()
+    restored = Dice('2d6', stream=DiceStream(*stream.getstate()))
+    for roll in range(1000):
+        assert die.roll() == restored.roll()
+
+
+def test_registry_substreams():
+    registry = DiceRegistry(1234)
+    stream_1, stream_2 = registry.stream(), registry.stream()
+    assert stream_1.seed != stream_2.seed
+    assert DiceRegistry(1234).stream().seed == stream_1.seed
+    assert registry.dice('1d8', stream_1).expression is registry.expression('1d8')
+
+
+def test_verbose_roll_record():
+    die_1 = Dice('3d6', 7890)
+    die_2 = Dice('3d6', 7890)
+    for roll in range(100):
+        result_roll, record = die_1.roll_advantage(advantage=Advantage.dis, verbose=True, modifier=2)
+        first, second = record.branches
+        assert result_roll == record.result == min(first.total, second.total) + 2
+        assert list(first.rolls) == [die_2.rand_gen.randint(1, 6) for die in range(3)]
+        assert list(second.rolls) == [die_2.rand_gen.randint(1, 6) for die in range(3)]
+        assert str(record) == f'First roll:{first}\nSecond roll:{second}\n' \
+                              f'Disadvantage: {record.total}. Modifier: 2'
+
+
+def test_registry_interning():
+    registry = DiceRegistry(1234)
+    stream = registry.stream()
+    die = registry.dice('1d20', stream)
+    assert registry.dice('1d20', stream) is die
+    assert registry.dice('1d20', registry.stream()) is not die
+
+
+def test_batch_stream_is_separate():
+    die_1 = Dice('1d20', stream=DiceStream(1234))
+    die_2 = Dice('1d20', stream=DiceStream(1234))
+    die_1.roll_batch(1000)
+    for roll in range(100):
+        assert die_1.roll() == die_2.roll()
+    assert die_1.stream.counter == die_2.stream.counter
+
+
 if __name__ == '__main__':
     main()
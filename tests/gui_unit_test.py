@@ -0,0 +1,195 @@
+import pytest
+import tcod
+
+from color import Color
+from event_pump import EventPump
+from frame_scheduler import FrameScheduler
+import gui_element
+from info_tab import InfoTab
+from menus import ListedMenu, MovementMenu, TextMenu
+from status_tab import StatusTab
+from swap_chain import SwapChain
+
+
+def test_dirty_tracking():
+    console = tcod.console.Console(40, 20, order='F')
+    menu = ListedMenu((2, 3), (14, 5), console)
+    menu.add_command(name='move', command=print)
+    menu.add_command(name='attack', command=print)
+    menu.activate()
+
+    assert menu.dirty()
+    menu.render()
+    menu.mark_drawn()
+    assert not menu.dirty() and menu.drawn_region == (2, 3, 14, 5)
+    menu.curser_down()
+    assert menu.dirty()
+    menu.mark_drawn()
+    menu.pause()
+    assert menu.dirty()
+
+    selection = MovementMenu((16, 12), (10, 2), console)
+    selection.activate()
+    selection.mark_drawn('A patch of smooth stone floor.')
+    assert not selection.dirty('A patch of smooth stone floor.')
+    assert selection.dirty('A solid brick wall.')
+    assert selection.region == gui_element.text_region((16, 12), '', 10, 2)
+    selection.render('A solid brick wall.')
+    assert selection.region == gui_element.text_region((16, 12), selection.description('A solid brick wall.'), 10, 2)
+
+
+def test_regions():
+    assert gui_element.regions_overlap((0, 0, 4, 4), (3, 3, 2, 2))
+    assert not gui_element.regions_overlap((0, 0, 4, 4), (4, 0, 2, 2))
+    assert gui_element.text_region((1, 2), 'ab\nabcd\n') == (1, 2, 4, 3)
+
+    status = StatusTab((0, 0), (12, 1))
+    console = tcod.console.Console(20, 10)
+    status.canvas = console
+    assert status.canvas is console
+
+    info = InfoTab((1, 1), (20, 5), console)
+    info.game_data = ['turn']
+    info.activate()
+    assert info.render_state(None, None, {'turn': 12})[2] == '\nturn: 12'
+    assert info.region == gui_element.text_region((1, 1), '')
+    info.render(None, None, {'turn': 12})
+    assert info.region == gui_element.text_region((1, 1), '\nturn: 12')
+
+
+def test_color_palette():
+    color = Color(0.2, 0.4, 0.6)
+
+    assert color.rgb() == (51, 102, 153)
+    assert color.rgb(shift=1) == (102, 153, 51) and color.rgb(shift=4) == color.rgb(shift=1)
+    assert color.rgb(invert=True) == (204, 153, 102)
+    assert tuple(color.rgb_array(invert=True, shift=2).tolist()) == color.rgb(invert=True, shift=2)
+    assert color.palette.shape == (2, 3, 3) and not color.palette.flags.writeable
+    assert Color.intern(0.2, 0.4, 0.6) is Color.intern(0.2, 0.4, 0.6)
+    assert Color.intern(0.2, 0.4, 0.6) is not color
+
+
+def test_frame_scheduler():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds: float):
+        slept.append(seconds)
+        now[0] += seconds
+
+    scheduler = FrameScheduler(10, idle_fps=5, max_skip=1, clock=lambda: now[0], sleep=sleep)
+    assert scheduler.begin_frame()
+    now[0] += 0.03
+    scheduler.end_frame()
+    assert abs(slept[-1] - 0.07) < 1e-9
+    assert abs(scheduler.stats.work_time - 0.03) < 1e-9
+
+    assert scheduler.begin_frame()
+    assert abs(scheduler.stats.fps - 10) < 1e-6
+    scheduler.end_frame(False)
+    assert scheduler.stats.idle and abs(slept[-1] - 0.2) < 1e-9
+
+    assert scheduler.begin_frame()
+    now[0] += 0.25
+    scheduler.end_frame()
+    assert not scheduler.begin_frame()
+    scheduler.end_frame()
+    assert scheduler.stats.skipped == 1
+    assert scheduler.begin_frame()
+
+
+def test_swap_chain():
+    console = tcod.console.Console(4, 3, order='F')
+    console.print(0, 0, 'a')
+    chain = SwapChain(console)
+    assert chain.front().rgb['ch'][0, 0] == ord('a')
+
+    back = chain.acquire()
+    back.print(1, 0, 'b')
+    assert chain.front() is not back
+    chain.publish(back)
+    assert chain.front() is back
+
+    first = chain.acquire()
+    first.print(2, 0, 'c')
+    chain.publish(first)
+    second = chain.acquire()
+    assert second is not first and second is not back
+    assert second.rgb['ch'][:3, 0].tolist() == [ord('a'), ord('b'), ord('c')]
+    chain.publish(second)
+    assert chain.front() is second
+    assert chain.frames == 3
+
+    pending = chain.acquire()
+    chain.publish(pending)
+    held = [chain.acquire(), chain.acquire()]
+    assert pending in held and chain.front() is second
+    assert len({id(buffer) for buffer in held + [chain.acquire(), second]}) == 4
+
+    console = tcod.console.Console(4, 3, order='C')
+    console.print(3, 0, 'd')
+    assert SwapChain(console).front().rgb['ch'][3, 0] == ord('d')
+
+
+def test_event_pump():
+    calls = []
+    play = ListedMenu((0, 0), (10, 5))
+    play.add_command(name='quit', command=lambda: calls.append('quit'), hidden=True)
+    play.add_command(name='move', command=lambda: (calls.append('move'), play.pause(), selection.activate()))
+    selection = ListedMenu((0, 0), (10, 5))
+    selection.add_command(name='back', command=lambda: (calls.append('back'), selection.deactivate(),
+                                                        play.unpause()))
+    pump = EventPump({'play': play, 'selection': selection})
+    assert pump.focused is None
+
+    play.activate()
+    assert pump.focused is play
+    enter = tcod.event.KeyDown(scancode=tcod.event.Scancode.RETURN, sym=tcod.event.KeySym.RETURN,
+                               mod=tcod.event.Modifier.NONE)
+    assert pump.dispatch([enter, enter, enter]) == 3
+    assert calls == ['move', 'back', 'move']
+    assert pump.focused is selection
+    assert pump.events == 3
+
+
+def test_key_bindings():
+    calls = []
+    menu = ListedMenu((0, 0), (10, 5))
+    menu.add_command(name='quit', command=lambda: calls.append('quit'), hidden=True)
+    menu.add_command(name='pause', command=lambda: calls.append('pause'), hidden=True,
+                     override=tcod.event.KeySym.ESCAPE)
+    menu.add_command(name='move', command=lambda: calls.append('move'))
+    menu.activate()
+    menu.bindings[tcod.event.KeySym.ESCAPE]()
+    menu.bindings[tcod.event.KeySym.RETURN]()
+    assert calls == ['pause', 'move']
+
+    menu.rebind_key('select', tcod.event.KeySym.SPACE)
+    assert tcod.event.KeySym.RETURN not in menu.bindings
+    menu.rebind_key('pause', tcod.event.KeySym.P)
+    assert menu.bindings[tcod.event.KeySym.ESCAPE] is not None
+    menu.bindings[tcod.event.KeySym.ESCAPE]()
+    menu.bindings[tcod.event.KeySym.P]()
+    assert calls == ['pause', 'move', 'quit', 'pause']
+    with pytest.raises(ValueError):
+        menu.rebind_key('up', tcod.event.KeySym.DOWN)
+    with pytest.raises(ValueError):
+        menu.rebind_key('jump', tcod.event.KeySym.J)
+
+    text_menu = TextMenu((0, 0), (10, 5))
+    text_menu.activate()
+    text_menu.add_command(name='confirm', command=lambda text: calls.append(text))
+    for key in (tcod.event.KeySym.A, tcod.event.KeySym.D, tcod.event.KeySym.BACKSPACE, tcod.event.KeySym.E,
+                tcod.event.KeySym.RETURN):
+        text_menu.bindings[key]()
+    assert calls[-1] == 'AE'
+
+    calls.clear()
+    for sym in (tcod.event.KeySym.SPACE, tcod.event.KeySym.Z, tcod.event.KeySym.RETURN):
+        menu.handle_event(tcod.event.KeyDown(scancode=tcod.event.Scancode.UNKNOWN, sym=sym,
+                                             mod=tcod.event.Modifier.NONE))
+    menu.handle_event(tcod.event.Quit())
+    menu.pause()
+    menu.handle_event(tcod.event.KeyDown(scancode=tcod.event.Scancode.UNKNOWN, sym=tcod.event.KeySym.P,
+                                         mod=tcod.event.Modifier.NONE))
+    assert calls == ['move', 'quit']
@@ -0,0 +1,137 @@
+import numpy
+import tcod
+
+from color import Color
+import map_renderer
+from map_renderer import MapRenderer
+from map_token import CreatureToken
+from render_layers import Compositor, RenderLayer
+from room import Room
+
+
+def make_renderer(size: tuple[int, int]) -> MapRenderer:
+    renderer = MapRenderer((0, 0), size)
+    renderer.add_rule('W', 'ftft', renderer.pipe_symbols[9])
+    renderer.add_rule('W', 'tftf', renderer.pipe_symbols[10])
+    renderer.add_rule('W', 'fttf', renderer.pipe_symbols[3])
+    renderer.add_rule('F', 'a', renderer.block_symbols[2], foreground=Color(0.2, 0.4, 0.6))
+    renderer.add_rule('E', 'a', ' ')
+    return renderer
+
+
+def test_lookup_table():
+    renderer = make_renderer((4, 4))
+
+    assert map_renderer.sample_mask('ftft') == map_renderer.EAST | map_renderer.WEST
+    table = renderer.lookup_table('W')
+    assert table[map_renderer.sample_mask('tftf')][0] == renderer.pipe_symbols[10]
+    assert table[0][0] == 'W'
+    assert len(set(glyph for glyph, foreground, background in renderer.lookup_table('F'))) == 1
+
+    renderer.add_rule('W', 'ffff', renderer.block_symbols[1], foreground=Color(0.5, 0.5, 0.5))
+    assert renderer.lookup_table('W')[0][0] == renderer.block_symbols[1]
+
+
+def test_load_room():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [
+                ['W', 'W', 'W'],
+                ['W', 'F', 'F'],
+                ['W', 'F', 'F']
+               ]
+    test_room = Room.new(1234, tile_set, tile_map)
+    renderer = make_renderer((4, 4))
+
+    renderer.load_room(test_room)
+    glyphs = {position: tile[0] for position, tile in renderer.tiles.items()}
+    assert glyphs[(0, 0)] == renderer.pipe_symbols[3]
+    assert glyphs[(1, 0)] == renderer.pipe_symbols[9] and glyphs[(0, 1)] == renderer.pipe_symbols[10]
+    assert glyphs[(3, 3)] == ' '
+
+    test_room.add_tile((1, 1), {'icon': 1, 'passable': False})
+    assert renderer.sync_room() >= {(1, 1), (1, 0), (0, 1)}
+    renderer.load_tiles(test_room.stringify())
+    assert {position: tile[0] for position, tile in renderer.tiles.items()}[(1, 0)] == 'W'
+
+
+def test_render_layers():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [
+                ['W', 'W', 'W'],
+                ['W', 'F', 'F'],
+                ['W', 'F', 'F']
+               ]
+    test_room = Room.new(1234, tile_set, tile_map)
+    token = CreatureToken('token_name', (2, 2), None)
+
+    for order in ('F', 'C'):
+        renderer = make_renderer((3, 3))
+        renderer.canvas = tcod.console.Console(6, 5, order=order)
+        renderer.position = (1, 2)
+        renderer.load_room(test_room)
+        renderer.load_entities([token])
+        renderer.highlighted_tiles = [(1, 1)]
+        renderer.activate()
+        renderer.render()
+
+        grid = map_renderer.console_grid(renderer.canvas)
+        assert grid['ch'][1, 2] == ord(renderer.pipe_symbols[3])
+        assert grid['ch'][2, 3] == ord(renderer.block_symbols[2])
+        assert tuple(grid['fg'][2, 3]) == Color(0.2, 0.4, 0.6).rgb(shift=1)
+        assert tuple(grid['fg'][3, 3]) == Color(0.2, 0.4, 0.6).rgb()
+        assert grid['ch'][3, 4] == ord('P')
+        assert grid['ch'][4, 2] == ord(' ')
+
+        for size in ((3, 3), (4, 1), (1, 4)):
+            console = tcod.console.Console(*size, order=order)
+            console.print(size[0] - 1, 0, 'x')
+            assert map_renderer.console_grid(console)['ch'][size[0] - 1, 0] == ord('x')
+
+
+def test_camera():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [['F'] * 12 for row in range(10)]
+    test_room = Room.new(1234, tile_set, tile_map)
+    renderer = make_renderer((4, 3))
+    renderer.canvas = tcod.console.Console(4, 3, order='F')
+    test_room.tile_map = None
+    renderer.load_room(test_room)
+    renderer.activate()
+    assert renderer.room_size == (12, 10)
+
+    renderer.scroll(3, 2)
+    assert renderer.camera == (3, 2)
+    assert set(renderer.tiles.keys()) == {(x, y) for x in range(3, 7) for y in range(2, 5)}
+    renderer.center_on((20, 20))
+    assert renderer.camera == (8, 7)
+    renderer.follow((2, 8))
+    assert renderer.camera == (2, 7)
+
+    test_room.add_tile((3, 8), {'icon': 1, 'passable': False})
+    test_room.add_tile((0, 0), {'icon': 1, 'passable': False})
+    renderer.sync_room()
+    renderer.render()
+    assert renderer.canvas.rgb['ch'][1, 1] == ord('W')
+    assert renderer.canvas.rgb['ch'][0, 1] == ord(renderer.block_symbols[2])
+
+
+def test_compositor():
+    terrain = RenderLayer((3, 2))
+    overlay = RenderLayer((3, 2), glyphs=False)
+    compositor = Compositor((3, 2), [terrain, overlay])
+    xs, ys = numpy.array([0, 1, 2]), numpy.array([0, 0, 1])
+    terrain.paint(xs, ys, numpy.array([65, 66, 67]), numpy.full((3, 3), 10), numpy.full((3, 3), 20))
+    assert compositor.compose().all()
+    assert compositor.compose().sum() == 0
+
+    terrain.paint(xs, ys, numpy.array([65, 66, 68]), numpy.full((3, 3), 10), numpy.full((3, 3), 20))
+    overlay.replace(numpy.array([1]), numpy.array([0]), None, numpy.array([[1, 2, 3]]), numpy.array([[4, 5, 6]]))
+    assert {tuple(cell) for cell in numpy.argwhere(compositor.compose())} == {(1, 0), (2, 1)}
+    assert compositor.glyphs[1, 0] == 66 and tuple(compositor.foreground[1, 0]) == (1, 2, 3)
+    assert compositor.glyphs[2, 1] == 68
+
+    overlay.replace(numpy.array([], dtype=int), numpy.array([], dtype=int), None,
+                    numpy.zeros((0, 3)), numpy.zeros((0, 3)))
+    assert {tuple(cell) for cell in numpy.argwhere(compositor.compose())} == {(1, 0)}
+    assert tuple(compositor.foreground[1, 0]) == (10, 10, 10)
+    assert compositor.covered.tolist() == [[True, False], [True, False], [False, True]]
@@ -1,6 +1,11 @@
+from character_sheet.enums import AbilityScore
+from event_pump import EventPump
+import headless
+from main import init_player
 from map_token import CreatureToken
 import room
 from room import Room
+from turn_tracker import TurnTracker
 
 
 def test_draw_tiles_in_circle():
@@ -15,6 +20,17 @@ def test_draw_tiles_in_circle():
         assert x**2 + y**2 <= radius**2
 
 
+def test_stencil_cache():
+    assert room.circle_stencil(3) is room.circle_stencil(3)
+    assert not room.circle_stencil(3).flags.writeable
+    assert len(room.find_tiles_in_square(3, (0, 0))) == 25
+
+    clipped = room.find_tiles_in_circle(3, (0, 1), bounds=(4, 4))
+    assert set(clipped) == {point for point in room.find_tiles_in_circle(3, (0, 1))
+                            if 0 <= point[0] < 4 and 0 <= point[1] < 4}
+    assert (room.translate_stencil(room.square_stencil(2), (5, 5)) >= 4).all()
+
+
 def test_render_room():
     tile_set = ['E', 'F', 'W']
     size = (5, 5)
@@ -96,3 +112,279 @@ def test_new_map():
     for y, column in enumerate(tile_map):
         for x, tile in enumerate(column):
             assert test_room._tile_set_icons[test_room.tiles[(x, y)].icon] == tile
+
+
+def test_tile_grid():
+    tile_set = {
+                'E': {'icon': -1},
+                'F': {'icon': 0},
+                'W': {'icon': 1, 'passable': False},
+                'R': {'icon': 2, 'movement_cost': 2}
+                }
+    tile_map = [
+                ['W', 'W', 'W'],
+                ['W', 'R', 'F'],
+                ['W', 'F', 'F', 'F']
+               ]
+
+    test_room = Room.new(1234, tile_set, tile_map)
+
+    assert test_room.size == (4, 3)
+    assert (2, 1) in test_room.tiles
+    assert (3, 1) not in test_room.tiles
+    assert test_room.tiles.passable.T.tolist() == [[False, False, False, False],
+                                                   [False, True, True, False],
+                                                   [False, True, True, True]]
+    assert test_room.tiles[(1, 1)].movement_cost == 2
+    assert test_room.tiles[(0, 0)].movement_cost == 1000
+    assert test_room.tile_map() == [['W', 'W', 'W', 'E'], ['W', 'R', 'F', 'E'], ['W', 'F', 'F', 'F']]
+
+
+def test_transfer_token():
+    test_room = Room(1234, (3, 3), ['E', 'F', 'W'])
+    token = CreatureToken('token_name', (0, 0), None)
+
+    test_room.tiles[(0, 0)].add_token(token)
+    room.transfer_token(token.name, test_room.tiles[(0, 0)], test_room.tiles[(2, 1)])
+
+    assert test_room.tiles[(0, 0)].tokens_list == {}
+    assert test_room.tiles[(2, 1)].get_token('token_name') is token
+    assert list(test_room.tiles.tokens.keys()) == [(2, 1)]
+
+
+def test_flood_fill_best_cost():
+    tile_set = {
+                'E': {'icon': -1},
+                'F': {'icon': 0},
+                'W': {'icon': 1, 'passable': False},
+                'R': {'icon': 2, 'movement_cost': 3}
+                }
+    tile_map = [
+                ['F', 'R', 'F', 'F'],
+                ['F', 'W', 'W', 'F'],
+                ['F', 'F', 'F', 'F']
+               ]
+    test_room = Room.new(5678, tile_set, tile_map)
+
+    fill = test_room.flood_fill((0, 0), 6)
+    fill_array = test_room.flood_fill_array((0, 0), 6)
+
+    assert fill == {(0, 0): 6, (1, 0): 3, (2, 0): 2, (3, 0): 1, (0, 1): 5, (0, 2): 4,
+                    (1, 2): 3, (2, 2): 2, (3, 2): 1, (3, 1): 0}
+    for point in fill.keys():
+        assert fill_array[point] == fill[point]
+    assert (fill_array >= 0).sum() == len(fill)
+    assert test_room.flood_fill((0, 0), 6) is fill
+
+
+def test_reachability_cache():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [
+                ['F', 'F', 'F'],
+                ['W', 'W', 'F'],
+                ['F', 'F', 'F']
+               ]
+    test_room = Room.new(1234, tile_set, tile_map)
+    player = CreatureToken('player', (0, 0), None)
+    monster = CreatureToken('monster', (0, 2), None)
+    test_room.add_token(player)
+    test_room.add_token(monster)
+
+    movement_range = player.valid_movements(test_room)
+    assert player.valid_movements(test_room) is movement_range
+    assert (0, 2) not in movement_range and (1, 2) in movement_range
+
+    test_room.move_token(monster, (2, 1))
+    movement_range = player.valid_movements(test_room)
+    assert monster.position == (2, 1)
+    assert (2, 1) not in movement_range and (1, 2) not in movement_range
+
+    test_room.add_tile((1, 1), {'icon': 0})
+    assert (1, 2) in player.valid_movements(test_room)
+
+
+def test_find_path():
+    tile_set = {
+                'E': {'icon': -1},
+                'F': {'icon': 0},
+                'W': {'icon': 1, 'passable': False},
+                'R': {'icon': 2, 'movement_cost': 3}
+                }
+    tile_map = [
+                ['F', 'F', 'F', 'F', 'F'],
+                ['F', 'W', 'W', 'W', 'R'],
+                ['F', 'F', 'F', 'W', 'F']
+               ]
+    test_room = Room.new(5678, tile_set, tile_map)
+
+    path = test_room.find_path((0, 2), (4, 2))
+    assert path[0] == (0, 2) and path[-1] == (4, 2)
+    assert sum(test_room.tiles[point].movement_cost for point in path[1:]) == 10
+    assert test_room.find_path((0, 2), (2, 1)) == []
+    assert test_room.find_path((1, 0), (0, 2), diagonal=True) == test_room.find_path((1, 0), (0, 2))
+    open_room = Room.new(5678, tile_set, [['F', 'F', 'F'], ['F', 'F', 'F'], ['F', 'F', 'F']])
+    assert len(open_room.find_path((0, 0), (2, 2), diagonal=True)) < len(open_room.find_path((0, 0), (2, 2)))
+
+    player = CreatureToken('player', (0, 2), None)
+    test_room.add_token(player)
+    assert player.take_movement_action(test_room, (4, 2)) == (3, 0)
+    assert test_room.tiles[(3, 0)].get_token('player') is player
+    assert player.take_movement_action(test_room, (4, 2)) == (3, 0)
+    player.take_turn()
+    assert player.take_movement_action(test_room, (4, 2)) == (4, 2)
+
+    corner_room = Room.new(5678, tile_set, [['F', 'W'], ['W', 'F']])
+    assert corner_room.find_path((0, 0), (1, 1), diagonal=True) == []
+    corner_room = Room.new(5678, tile_set, [['F', 'W'], ['F', 'F']])
+    assert corner_room.find_path((0, 0), (1, 1), diagonal=True) == [(0, 0), (0, 1), (1, 1)]
+
+
+def test_distance_map():
+    tile_set = {
+                'E': {'icon': -1},
+                'F': {'icon': 0},
+                'W': {'icon': 1, 'passable': False},
+                'R': {'icon': 2, 'movement_cost': 3},
+                'S': {'icon': 3}
+                }
+    tile_map = [
+                ['F', 'F', 'F', 'F', 'F'],
+                ['F', 'W', 'W', 'W', 'R'],
+                ['S', 'F', 'F', 'W', 'F']
+               ]
+    test_room = Room.new(5678, tile_set, tile_map)
+
+    distances = test_room.distance_map()
+    assert distances[(0, 2)] == 0 and distances[(2, 2)] == 2
+    assert distances[(4, 2)] == 10 and distances[(2, 1)] == -1
+    assert (test_room.distance_map([(0, 2)]) == distances).all()
+
+    player = CreatureToken('player', (0, 2), None)
+    monster = CreatureToken('monster', (4, 2), None)
+    test_room.add_token(player)
+    test_room.add_token(monster)
+    distances = test_room.distance_map([player.position])
+    monster.take_turn(test_room, distances)
+    assert monster.position == (3, 0)
+    monster.take_turn(test_room, distances)
+    assert monster.position == (0, 1)
+    assert test_room.tiles[(0, 1)].get_token('monster') is monster
+    player.take_turn(test_room, distances)
+    assert player.position == (0, 2)
+
+    tracker_room = Room.new(5678, tile_set, tile_map)
+    hero, monster = init_player(tracker_room.tiles), init_player(tracker_room.tiles)
+    hero.position, monster.name, monster.position = (2, 2), 'monster', (4, 2)
+    tracker = TurnTracker(1234)
+    for token in (hero, monster):
+        tracker_room.add_token(token)
+        tracker.add_token(token)
+    tracker.process_turn(tracker_room, player=hero)
+    assert hero.position == (2, 2) and hero.action_movement
+    assert monster.position == (3, 0)
+
+
+def test_initiative_modifier():
+    tracker_room = Room.new(5678, {'F': {'icon': 0}, 'U': {'icon': 3}}, [['U', 'F', 'F']])
+    tracker = TurnTracker(1234)
+    for dexterity in (14, 8, 14, 8, 10):
+        token = init_player(tracker_room.tiles)
+        token.sheet.ability_scores.ability_scores[AbilityScore.DEX] = dexterity
+        tracker.add_token(token)
+    assert len(tracker.initiative_order) == 5
+    assert all(isinstance(order, int | float) for order in tracker.initiative_order.keys())
+
+
+def test_field_of_view():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [
+                ['F', 'F', 'F', 'F', 'F', 'F', 'F'],
+                ['F', 'F', 'F', 'F', 'F', 'F', 'F'],
+                ['F', 'F', 'F', 'W', 'F', 'F', 'F'],
+                ['F', 'F', 'F', 'F', 'F', 'F', 'F'],
+                ['F', 'F', 'F', 'F', 'F', 'F', 'F']
+               ]
+    test_room = Room.new(1234, tile_set, tile_map)
+    monster = CreatureToken('monster', (6, 2), None)
+    test_room.add_token(monster)
+
+    visible = test_room.visible_tiles((1, 2), 6)
+    assert (3, 2) in visible and (6, 0) in visible
+    assert (4, 2) not in visible and (5, 2) not in visible
+    assert not test_room.line_of_sight((1, 2), (6, 2))
+    assert test_room.visible_tokens((1, 2), 6) == []
+    assert test_room.visible_tiles((1, 2), 6) is visible
+
+    circle = {point for point in room.find_tiles_in_circle(2, (3, 0)) if point in test_room.tiles}
+    assert test_room.visible_tiles((3, 0), 2) == circle
+    test_room.move_token(monster, (5, 0))
+    assert test_room.visible_tokens((1, 2), 6) == [monster]
+    assert test_room.line_of_sight((1, 2), (5, 0))
+
+
+def test_spatial_index():
+    test_room = Room(1234, (40, 40), ['E', 'F', 'W'])
+    player = CreatureToken('player', (5, 5), None)
+    goblin = CreatureToken('goblin', (8, 9), None)
+    orc = CreatureToken('orc', (30, 30), None)
+    for token in (player, goblin, orc):
+        test_room.add_token(token)
+
+    assert test_room.get_tokens_in_range((5, 5), 5) == [player, goblin]
+    assert test_room.get_tokens_in_rect((0, 0), (8, 8)) == [player]
+    assert test_room.get_nearest_tokens((29, 25), 2) == [orc, goblin]
+    assert test_room.get_nearest_tokens((29, 25), 2, max_radius=10) == [orc]
+
+    test_room.move_token(orc, (6, 6))
+    assert test_room.get_nearest_tokens((5, 5), 3) == [player, orc, goblin]
+    test_room.remove_token(player)
+    assert set(test_room.get_tokens_in_range((5, 5), 5)) == {goblin, orc}
+    assert player not in test_room.token_index and len(test_room.token_index) == 2
+
+
+def test_tile_change_feed():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [
+                ['W', 'W', 'W'],
+                ['W', 'F', 'W'],
+                ['W', 'W', 'W']
+               ]
+    test_room = Room.new(1234, tile_set, tile_map)
+    revision = test_room.revision
+
+    assert test_room.changes_since(revision) == set()
+    test_room.add_tile((1, 1), {'icon': 1, 'passable': False})
+    test_room.add_tile((0, 0), {'icon': 0})
+    assert test_room.changes_since(revision) == {(1, 1), (0, 0)}
+    assert test_room.changes_since(test_room.revision - 1) == {(0, 0)}
+    assert test_room.stringify() == 'FWW\nWWW\nWWW\n'
+    assert test_room.tile_char((1, 1)) == 'W' and test_room.tile_char((5, 5)) == 'E'
+
+
+def test_token_revision():
+    tile_set = {'E': {'icon': -1}, 'F': {'icon': 0}, 'W': {'icon': 1, 'passable': False}}
+    tile_map = [['F', 'F', 'F'], ['W', 'W', 'F'], ['F', 'F', 'F']]
+    test_room = Room.new(1234, tile_set, tile_map)
+    visible = test_room.visible_tiles((0, 0), 4)
+    assert test_room.find_path((0, 0), (0, 2))[1] == (1, 0)
+
+    revision, token_revision = test_room.revision, test_room.token_revision
+    test_room.add_token(CreatureToken('blocker', (1, 0), None))
+    assert test_room.revision == revision and test_room.token_revision == token_revision + 1
+    assert test_room.visible_tiles((0, 0), 4) is visible
+    assert test_room.find_path((0, 0), (0, 2)) == []
+
+
+def test_headless_run():
+    game_state = headless.init_headless_game()
+    start = game_state.player.position
+    moves = []
+    move_token = game_state.rooms[0].move_token
+    game_state.rooms[0].move_token = lambda token, position: (moves.append(position), move_token(token, position))
+
+    report = headless.run(game_state, 4)
+    assert report.turns == 4 and report.events == 12
+    x, y = start
+    assert moves == [(x + 1, y), (x + 1, y + 1), (x + 2, y + 1), (x + 2, y + 2)]
+    assert game_state.player.position == (x + 2, y + 2)
+    assert EventPump(game_state.menus).focused is game_state.menus['play']
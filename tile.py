@@ -64,3 +64,42 @@ class Tile:
 
     def remove_token(self, token_name: str):
         self._token_list.pop(token_name)
+
+
+class GridTile(Tile):
+
+    def __init__(self, grid, position: tuple[int, int]):
+        self._grid = grid
+        self._position = position
+
+    @property
+    def icon(self) -> int:
+        return int(self._grid.icon[self._position])
+
+    @property
+    def movement_cost(self) -> int:
+        if self.passable:
+            return int(self._grid.movement_cost[self._position])
+        else:
+            return 1000
+
+    @property
+    def passable(self) -> bool:
+        return bool(self._grid.passable[self._position])
+
+    @property
+    def description(self):
+        return self._grid.description(self._position)
+
+    @property
+    def tokens_list(self) -> dict[str, CreatureToken]:
+        return self._grid.tokens_at(self._position)
+
+    def add_token(self, new_token: CreatureToken):
+        self._grid.add_token(self._position, new_token)
+
+    def get_token(self, token_name: str) -> CreatureToken:
+        return self.tokens_list.get(token_name)
+
+    def remove_token(self, token_name: str):
+        self._grid.remove_token(self._position, token_name)
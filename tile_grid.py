@@ -0,0 +1,145 @@
+from __future__ import annotations
+from collections import deque
+from collections.abc import Mapping
+from typing import Iterator
+
+import numpy
+
+from map_token import CreatureToken
+from spatial_index import SpatialIndex
+from tile import GridTile
+
+UNDEFINED = -1
+CHANGE_LOG_LENGTH = 4096
+
+
+def tile_type_key(tile_type: dict[str, any]) -> tuple:
+    return tuple(sorted(tile_type.items()))
+
+
+class TileGrid(Mapping):
+    def __init__(self, size: tuple[int, int]):
+        self._size = size
+        self._type_keys: dict[tuple, int] = {}
+        self._type_icon: list[int] = []
+        self._type_passable: list[bool] = []
+        self._type_movement_cost: list[int] = []
+        self._type_description: list[str] = []
+        self.type_index = numpy.full(size, UNDEFINED, dtype=numpy.int16)
+        self.icon = numpy.zeros(size, dtype=numpy.int16)
+        self.passable = numpy.zeros(size, dtype=bool)
+        self.movement_cost = numpy.ones(size, dtype=numpy.int16)
+        self.tokens: dict[tuple[int, int], dict[str, CreatureToken]] = {}
+        self.token_index = SpatialIndex()
+        self._revision = 0
+        self._token_revision = 0
+        self._changes: deque[tuple[int, tuple[int, int]]] = deque(maxlen=CHANGE_LOG_LENGTH)
+        self._reset_revision = 0
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def token_revision(self) -> int:
+        return self._token_revision
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    @property
+    def defined(self) -> numpy.ndarray:
+        return self.type_index != UNDEFINED
+
+    def add_type(self, tile_type: dict[str, any]) -> int:
+        key = tile_type_key(tile_type)
+        if key not in self._type_keys:
+            self._type_keys[key] = len(self._type_icon)
+            self._type_icon.append(tile_type.get('icon', 0))
+            self._type_passable.append(tile_type.get('passable', True))
+            self._type_movement_cost.append(tile_type.get('movement_cost', 1))
+            self._type_description.append(tile_type.get('description', 'err: no description found'))
+        return self._type_keys[key]
+
+    def fill(self, type_index: numpy.ndarray):
+        self.type_index[...] = type_index
+        defined = self.defined
+        lookup = numpy.maximum(self.type_index, 0)
+        self.icon[...] = numpy.where(defined, numpy.array(self._type_icon, dtype=numpy.int16)[lookup], 0)
+        self.passable[...] = defined & numpy.array(self._type_passable, dtype=bool)[lookup]
+        self.movement_cost[...] = numpy.where(
+            defined, numpy.array(self._type_movement_cost, dtype=numpy.int16)[lookup], 1
+        )
+        self._revision += 1
+        self._changes.clear()
+        self._reset_revision = self._revision
+
+    def in_bounds(self, position: tuple[int, int]) -> bool:
+        x, y = position
+        return 0 <= x < self._size[0] and 0 <= y < self._size[1]
+
+    def set_tile(self, position: tuple[int, int], tile_type: dict[str, any]):
+        if not self.in_bounds(position):
+            raise IndexError(f'Tile position {position} is outside of the room size {self._size}')
+        index = self.add_type(tile_type)
+        self.type_index[position] = index
+        self.icon[position] = self._type_icon[index]
+        self.passable[position] = self._type_passable[index]
+        self.movement_cost[position] = self._type_movement_cost[index]
+        self._revision += 1
+        self._changes.append((self._revision, position))
+
+    def changes_since(self, revision: int) -> set[tuple[int, int]] or None:
+        if revision < self._reset_revision:
+            return None
+        if len(self._changes) == CHANGE_LOG_LENGTH and revision < self._changes[0][0] - 1:
+            return None
+        changes = set()
+        for change_revision, position in reversed(self._changes):
+            if change_revision <= revision:
+                break
+            changes.add(position)
+        return changes
+
+    def description(self, position: tuple[int, int]) -> str:
+        return self._type_description[self.type_index[position]]
+
+    def find_icon(self, icon: int) -> list[tuple[int, int]]:
+        return [(int(x), int(y)) for x, y in numpy.argwhere(self.defined & (self.icon == icon))]
+
+    def tokens_at(self, position: tuple[int, int]) -> dict[str, CreatureToken]:
+        if position in self.tokens:
+            return self.tokens[position]
+        return {}
+
+    def add_token(self, position: tuple[int, int], new_token: CreatureToken):
+        if position not in self.tokens:
+            self.tokens[position] = {}
+        self.tokens[position][new_token.name] = new_token
+        self.token_index.add(new_token, position)
+        self._token_revision += 1
+
+    def remove_token(self, position: tuple[int, int], token_name: str):
+        self.token_index.remove(self.tokens[position].pop(token_name))
+        if len(self.tokens[position]) == 0:
+            del self.tokens[position]
+        self._token_revision += 1
+
+    def occupied(self, position: tuple[int, int]) -> bool:
+        return position in self.tokens
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        return self.in_bounds(position) and self.type_index[position] != UNDEFINED
+
+    def __getitem__(self, position: tuple[int, int]) -> GridTile:
+        if position not in self:
+            raise KeyError(position)
+        return GridTile(self, position)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        for x, y in numpy.argwhere(self.defined):
+            yield int(x), int(y)
+
+    def __len__(self) -> int:
+        return int(numpy.count_nonzero(self.defined))
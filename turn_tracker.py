@@ -28,7 +28,9 @@ class TurnTracker:
 
     def add_to_initiative(self, key):
         new_token: CreatureToken = self._tokens[key]
-        order: float = new_token.roll_initiative()
+        order = new_token.roll_initiative()
+        if isinstance(order, tuple):
+            order = order[0]
         if order in self._initiative_order and self._initiative_order[order] is not key:
             roll, log_str = self._die.roll()
             order += roll/1000
@@ -47,10 +49,18 @@ class TurnTracker:
             position = next((pos for pos, p_key in self._initiative_order.items() if p_key == key), 0.0)
             self._initiative_order.pop(position)
 
-    def process_turn(self):
+    def process_turn(self, room=None, goals: list[tuple[int, int]] = None, player: CreatureToken = None):
+        distance_map = None
         for order in sorted(self._initiative_order.keys(), reverse=True):
-            token_key = self._initiative_order[order]
-            self._tokens[token_key].take_turn()
+            token = self._tokens[self._initiative_order[order]]
+            if token is player:
+                token.take_turn()
+                continue
+            if distance_map is None and room is not None:
+                if goals is None:
+                    goals = room.stairs() if player is None else [player.position] + room.stairs()
+                distance_map = room.distance_map(goals)
+            token.take_turn(room, distance_map)
 
     @property
     def initiative_order(self):